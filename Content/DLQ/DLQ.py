@@ -1,18 +1,27 @@
-import os, random, shutil, subprocess
-from PIL import Image, ImageDraw, ImageFont
+import os, random, sys
+from bisect import bisect_right
+from pathlib import Path
+from PIL import ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Content/, for videokit
+from videokit.backgrounds import layer
+from videokit.aspects import open_writer
+from videokit.fonts import load
+from videokit.pipeline import encode_frames
+from videokit.preview import Preview, render_preview
+from videokit.runner import RenderStats
+from videokit.sprites import blit_text
+from videokit.stills import StillCapture
+from videokit.timeline import Timeline
 
 W, H = 1280, 720
 FPS = 15  # fast render
 
 def load_font(size=28, bold=False):
-    candidates = [
+    return load((
         "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
         "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            return ImageFont.truetype(p, size=size)
-    return ImageFont.load_default()
+    ), size)
 
 FONT_XL = load_font(52, bold=True)
 FONT_L = load_font(30, bold=True)
@@ -23,28 +32,9 @@ FONT_MONO = load_font(20, bold=False)
 BIG_92 = load_font(92, bold=True)
 BIG_120 = load_font(120, bold=True)
 
-def lerp(a, b, t): 
-    return int(a + (b - a) * t)
-
-def make_fast_gradient_bg():
-    # Build a small gradient and upscale (much faster than per-pixel full res)
-    w0, h0 = 320, 180
-    base = Image.new("RGB", (w0, h0), (15, 23, 42))
-    px = base.load()
-    c1, c2, c3 = (15, 23, 42), (60, 20, 90), (15, 23, 42)
-    for y in range(h0):
-        for x in range(w0):
-            t = (x + y) / (w0 + h0)
-            if t < 0.5:
-                u = t / 0.5
-                r, g, b = lerp(c1[0], c2[0], u), lerp(c1[1], c2[1], u), lerp(c1[2], c2[2], u)
-            else:
-                u = (t - 0.5) / 0.5
-                r, g, b = lerp(c2[0], c3[0], u), lerp(c2[1], c3[1], u), lerp(c2[2], c3[2], u)
-            px[x, y] = (r, g, b)
-    return base.resize((W, H), resample=Image.BILINEAR)
-
-BG = make_fast_gradient_bg().convert("RGBA")
+def background():
+    # Built on first use (and cached by layer()), so importing the script stays cheap.
+    return layer((W, H), ((15, 23, 42), (60, 20, 90), (15, 23, 42)), "diagonal", mode="RGBA")
 
 def alpha_color(rgb, a): 
     return (rgb[0], rgb[1], rgb[2], a)
@@ -55,11 +45,11 @@ def round_rect(draw, xy, radius, fill=None, outline=None, width=1):
 def draw_centered(draw, text, y, font, fill):
     bb = draw.textbbox((0, 0), text, font=font)
     w = bb[2] - bb[0]
-    draw.text(((W - w) // 2, y), text, font=font, fill=fill)
+    blit_text(draw, ((W - w) // 2, y), text, font=font, fill=fill)
 
 def make_card(draw, x, y, w, h, title, border, fill, title_fill=(255, 255, 255), radius=16):
     round_rect(draw, (x, y, x + w, y + h), radius, fill=fill, outline=border, width=2)
-    draw.text((x + 18, y + 14), title, font=FONT_L, fill=title_fill)
+    blit_text(draw, (x + 18, y + 14), title, font=FONT_L, fill=title_fill)
 
 def draw_scenario_pill(draw, text, y, color_rgba):
     tb = draw.textbbox((0, 0), text, font=FONT_M_B)
@@ -67,67 +57,90 @@ def draw_scenario_pill(draw, text, y, color_rgba):
     ph = (tb[3]-tb[1]) + 18
     px = (W - pw) // 2
     round_rect(draw, (px, y, px+pw, y+ph), 22, fill=alpha_color((0, 0, 0), 120), outline=color_rgba, width=3)
-    draw.text((px + 17, y + 9), text, font=FONT_M_B, fill=color_rgba)
+    blit_text(draw, (px + 17, y + 9), text, font=FONT_M_B, fill=color_rgba)
 
 # Timeline
 INTRO_DUR = 0.9
 RUN_DUR = 7.8
 TRANS_DUR = 0.6
 OUTRO_DUR = 1.6
-TOTAL_DUR = INTRO_DUR + RUN_DUR + TRANS_DUR + RUN_DUR + OUTRO_DUR
-TOTAL_FRAMES = int(TOTAL_DUR * FPS)
-
-# Deterministic errors
-random.seed(7)
-is_error = {i: (random.random() < 0.2) for i in range(1, 11)}
-
-def run_phase(t):
-    if t < INTRO_DUR: 
-        return ("intro", t)
-    t -= INTRO_DUR
-    if t < RUN_DUR: 
-        return ("dlq_run", t)
-    t -= RUN_DUR
-    if t < TRANS_DUR: 
-        return ("transition", t)
-    t -= TRANS_DUR
-    if t < RUN_DUR: 
-        return ("no_dlq_run", t)
-    t -= RUN_DUR
-    return ("outro", t)
-
-SPACING = 0.75
+TIMELINE = Timeline([
+    ("intro", INTRO_DUR),
+    ("dlq_run", RUN_DUR),
+    ("transition", TRANS_DUR),
+    ("no_dlq_run", RUN_DUR),
+    ("outro", OUTRO_DUR),
+], FPS)
+TOTAL_DUR = TIMELINE.duration
+TOTAL_FRAMES = TIMELINE.n_frames
+
+# Message traffic; DLQ_VARIANT=10k renders 10,000 messages with 2% poison pills
+VARIANTS = {
+    "default": {"messages": 10, "poison": 0.2, "spacing": 0.75},
+    "10k": {"messages": 10_000, "poison": 0.02, "spacing": 0.00075},
+}
+VARIANT = os.environ.get("DLQ_VARIANT", "default")
 PROC = 0.95
 RESULT = 0.45
 
-def message_state(local_t, msg_id):
-    t0 = (msg_id - 1) * SPACING
-    if local_t < t0: return None
-    if local_t < t0 + PROC: return "processing"
-    if local_t < t0 + PROC + RESULT: return "error" if is_error[msg_id] else "success"
-    return "done"
-
-def dlq_list(local_t):
-    out = []
-    for i in range(1, 11):
-        t0 = (i - 1) * SPACING
-        if is_error[i] and local_t >= t0 + PROC + RESULT:
-            out.append(i)
-    return out
-
-def lost_count(local_t):
-    c = 0
-    for i in range(1, 11):
-        t0 = (i - 1) * SPACING
-        if is_error[i] and local_t >= t0 + PROC + RESULT:
-            c += 1
-    return c
+class MessageTimeline:
+    """Every message's start, result and done times, built once as sorted lists.
+
+    Messages start `spacing` apart and all take the same time, so at any
+    moment the in-flight ones are a contiguous id range and failures reach
+    the DLQ in id order; queries are binary searches.
+    """
+
+    def __init__(self, messages, poison, spacing, seed=7):
+        rng = random.Random(seed)  # same draws as random.seed(7) followed by random.random()
+        self.is_error = [rng.random() < poison for _ in range(messages)]
+        self.start = [(i - 1) * spacing for i in range(1, messages + 1)]
+        self.result = [t0 + PROC for t0 in self.start]
+        self.done = [t0 + PROC + RESULT for t0 in self.start]
+        self.failed_ids = [i + 1 for i, err in enumerate(self.is_error) if err]
+        self.failed_done = [self.done[i - 1] for i in self.failed_ids]
+
+    def in_flight(self, local_t, rows):
+        """Up to `rows` messages being processed or showing a result, as (id, state).
+
+        When more are in flight than fit, as in the 10k variant, the newest
+        would all still be processing; about half the rows then go to the
+        newest results instead, the latest failure among them.
+        """
+        lo = bisect_right(self.done, local_t)
+        mid = bisect_right(self.result, local_t)
+        hi = bisect_right(self.start, local_t)
+        if hi - lo <= rows:
+            shown = range(max(lo, hi - rows), hi)
+        else:
+            n_results = min(mid - lo, max((rows + 1) // 2, rows - (hi - mid)))
+            results = list(range(mid - n_results, mid))
+            j = bisect_right(self.failed_ids, mid) - 1  # ids are 1-based: the last failure at index < mid
+            if results and j >= 0 and lo < self.failed_ids[j] <= mid - n_results:
+                results[0] = self.failed_ids[j] - 1
+            shown = results + list(range(hi - (rows - n_results), hi))
+        out = []
+        for k in shown:
+            if local_t < self.result[k]:
+                out.append((k + 1, "processing"))
+            else:
+                out.append((k + 1, "error" if self.is_error[k] else "success"))
+        return out
+
+    def failed_count(self, local_t):
+        return bisect_right(self.failed_done, local_t)
+
+    def dlq(self, local_t, rows):
+        """Ids of the last `rows` failed messages that have reached the DLQ."""
+        c = self.failed_count(local_t)
+        return self.failed_ids[max(0, c - rows):c]
+
+MESSAGES = MessageTimeline(**VARIANTS[VARIANT])
 
 def draw_frame(frame_idx):
-    t = frame_idx / FPS
-    phase, lt = run_phase(t)
+    phase, lt, _ = TIMELINE.frame(frame_idx)
 
-    img = BG.copy()
+    img = background().copy()
     draw = ImageDraw.Draw(img, "RGBA")
 
     # Header
@@ -139,13 +152,13 @@ def draw_frame(frame_idx):
     draw_centered(draw, title1, header_y, FONT_XL, (255, 255, 255, int(255 * a)))
     bb2 = draw.textbbox((0, 0), title2, font=FONT_XL)
     w2 = bb2[2] - bb2[0]
-    draw.text(((W - w2) // 2, header_y + 58), title2, font=FONT_XL, fill=(245, 158, 11, int(255 * a)))
+    blit_text(draw, ((W - w2) // 2, header_y + 58), title2, font=FONT_XL, fill=(245, 158, 11, int(255 * a)))
     draw_centered(draw, subtitle, header_y + 118, FONT_M, (209, 213, 219, int(235 * a)))
 
     # Credits bottom-right
     credit = "Chaitanya Pothuraju"
     cb = draw.textbbox((0, 0), credit, font=FONT_S)
-    draw.text((W - (cb[2]-cb[0]) - 18, H - (cb[3]-cb[1]) - 14), credit, font=FONT_S, fill=(229, 231, 235, 220))
+    blit_text(draw, (W - (cb[2]-cb[0]) - 18, H - (cb[3]-cb[1]) - 14), credit, font=FONT_S, fill=(229, 231, 235, 220))
 
     # Pill + moved-down tiles
     pill_y = 162
@@ -182,8 +195,8 @@ def draw_frame(frame_idx):
         ]
         bx, by = panel_x + 90, 410
         for i, b in enumerate(bullets):
-            draw.text((bx, by + i*56), f"✔  {b}", font=FONT_M_B, fill=(74, 222, 128, 240))
-        return img.convert("RGB")
+            blit_text(draw, (bx, by + i*56), f"✔  {b}", font=FONT_M_B, fill=(74, 222, 128, 240))
+        return img
 
     # Card layout for other slides
     card_w = (W - pad*2 - col_gap) // 2
@@ -212,69 +225,65 @@ def draw_frame(frame_idx):
             border, fill, icon, icon_fill = (74,222,128,255), alpha_color((34,197,94), 46), "✔", (74,222,128,255)
 
         round_rect(draw, (cx, cy, cx+mw, cy+mh), 14, fill=fill, outline=border, width=2)
-        draw.text((cx+14, cy+10), f"Message #{msg_id}", font=FONT_MONO, fill=(255,255,255,235))
-        draw.text((cx+mw-32, cy+8), icon, font=FONT_L, fill=icon_fill)
+        blit_text(draw, (cx+14, cy+10), f"Message #{msg_id}", font=FONT_MONO, fill=(255,255,255,235))
+        blit_text(draw, (cx+mw-32, cy+8), icon, font=FONT_L, fill=icon_fill)
 
         if status == "processing":
             ang = (frame_idx * 15) % 360
             r = 10
             ox, oy = cx+mw-68, cy+mh-18
             draw.arc([ox-r, oy-r, ox+r, oy+r], start=ang, end=ang+240, fill=icon_fill, width=3)
-            draw.text((cx+14, cy+mh-28), "processing", font=FONT_S, fill=(191,219,254,220))
+            blit_text(draw, (cx+14, cy+mh-28), "processing", font=FONT_S, fill=(191,219,254,220))
         elif status == "error":
-            draw.text((cx+14, cy+mh-28), "error", font=FONT_S, fill=(254,202,202,220))
+            blit_text(draw, (cx+14, cy+mh-28), "error", font=FONT_S, fill=(254,202,202,220))
         else:
-            draw.text((cx+14, cy+mh-28), "success", font=FONT_S, fill=(187,247,208,220))
+            blit_text(draw, (cx+14, cy+mh-28), "success", font=FONT_S, fill=(187,247,208,220))
 
     # Pipeline list
     list_x, list_y = x1 + 18, y + 74
-    list_w, row_h = card_w - 36, 58
-    max_rows = 6
+    list_w, row_h, row_gap = card_w - 36, 58, 10
+    max_rows = (card_h - 74 - 18 + row_gap) // (row_h + row_gap)  # rows that fit above the card's bottom
 
     pipeline_msgs = []
     if mode in ("dlq", "no_dlq"):
-        for i in range(1, 11):
-            st = message_state(local_t, i)
-            if st in ("processing", "error", "success"):
-                pipeline_msgs.append((i, st))
-        pipeline_msgs = pipeline_msgs[-max_rows:]
+        pipeline_msgs = MESSAGES.in_flight(local_t, max_rows)
 
     if mode in ("dlq", "no_dlq") and not pipeline_msgs and local_t < 0.25:
-        draw.text((list_x, list_y+10), "Starting…", font=FONT_M, fill=(156,163,175,220))
+        blit_text(draw, (list_x, list_y+10), "Starting…", font=FONT_M, fill=(156,163,175,220))
 
     for idx, (mid, st) in enumerate(pipeline_msgs):
-        cy = list_y + idx * (row_h + 10)
+        cy = list_y + idx * (row_h + row_gap)
         draw_msg_card(list_x, cy, list_w, row_h, mid, st)
 
     # Right side
     if mode == "dlq":
-        dlq = dlq_list(local_t)
+        dlq = MESSAGES.dlq(local_t, max_rows)
         rx, ry, rw = x2 + 18, y + 74, card_w - 36
         if not dlq:
-            draw.text((rx, ry+10), "Failed messages land here for retry.", font=FONT_M, fill=(209,213,219,220))
+            blit_text(draw, (rx, ry+10), "Failed messages land here for retry.", font=FONT_M, fill=(209,213,219,220))
         else:
-            for idx, mid in enumerate(dlq[-6:]):
-                cy = ry + idx * (row_h + 10)
+            for idx, mid in enumerate(dlq):
+                cy = ry + idx * (row_h + row_gap)
                 round_rect(draw, (rx, cy, rx+rw, cy+row_h), 14,
                            fill=alpha_color((245,158,11), 46),
                            outline=(245,158,11,255), width=2)
-                draw.text((rx+14, cy+10), f"Message #{mid}", font=FONT_MONO, fill=(255,255,255,235))
-                draw.text((rx+14, cy+row_h-28), "recoverable (stored for replay)", font=FONT_S, fill=(253,230,138,230))
-                draw.text((rx+rw-36, cy+8), "⟳", font=FONT_L, fill=(253,230,138,255))
+                blit_text(draw, (rx+14, cy+10), f"Message #{mid}", font=FONT_MONO, fill=(255,255,255,235))
+                blit_text(draw, (rx+14, cy+row_h-28), "recoverable (stored for replay)", font=FONT_S, fill=(253,230,138,230))
+                blit_text(draw, (rx+rw-36, cy+8), "⟳", font=FONT_L, fill=(253,230,138,255))
 
     elif mode == "no_dlq":
-        c = lost_count(local_t)
+        c = MESSAGES.failed_count(local_t)
         if c == 0:
-            draw.text((x2+18, y+110), "Any failed message is lost permanently.", font=FONT_M, fill=(209,213,219,220))
+            blit_text(draw, (x2+18, y+110), "Any failed message is lost permanently.", font=FONT_M, fill=(209,213,219,220))
         else:
             s = str(c)
             bb = draw.textbbox((0,0), s, font=BIG_92)
             sw = bb[2]-bb[0]
             draw.text((x2 + (card_w - sw)//2, y+180), s, font=BIG_92, fill=(248,113,113,255))
-            draw.text((x2+70, y+290), "messages lost forever", font=FONT_L, fill=(252,165,165,240))
-            draw.text((x2+70, y+330), "no replay • no audit • no fix", font=FONT_M, fill=(254,202,202,220))
-            draw.text((x2+70, y+375), "…and the dashboard data stays wrong.", font=FONT_M, fill=(254,202,202,220))
-            draw.text((x2 + card_w - 120, y+165), "✖", font=BIG_120, fill=(248,113,113,180))
+            blit_text(draw, (x2+70, y+290), "messages lost forever", font=FONT_L, fill=(252,165,165,240))
+            blit_text(draw, (x2+70, y+330), "no replay • no audit • no fix", font=FONT_M, fill=(254,202,202,220))
+            blit_text(draw, (x2+70, y+375), "…and the dashboard data stays wrong.", font=FONT_M, fill=(254,202,202,220))
+            blit_text(draw, (x2 + card_w - 120, y+165), "✖", font=BIG_120, fill=(248,113,113,180))
 
     elif mode == "transition":
         bx, by, bw, bh = pad, y + 90, W - pad*2, 240
@@ -282,42 +291,44 @@ def draw_frame(frame_idx):
         draw_centered(draw, "Resetting…", by+36, FONT_XL, (255,255,255,240))
         draw_centered(draw, "Same traffic. Different outcome.", by+130, FONT_L, (255,255,255,240))
 
-    return img.convert("RGB")
+    return img
+
+def frame_key(frame_idx):
+    # The transition and outro panels are static; runs and the intro fade change every frame
+    phase, _, _ = TIMELINE.frame(frame_idx)
+    return (phase,) if phase in ("transition", "outro") else None
 
 # Write video via ffmpeg pipe
-OUT_DIR = "/mnt/data/dlq_video"
-os.makedirs(OUT_DIR, exist_ok=True)
-mp4_path = os.path.join(OUT_DIR, "dlq_simulation_v2.mp4")
-
-ffmpeg = shutil.which("ffmpeg")
-if not ffmpeg:
-    raise RuntimeError("ffmpeg is not available here.")
-
-cmd = [
-    ffmpeg, "-y",
-    "-f", "rawvideo",
-    "-vcodec", "rawvideo",
-    "-pix_fmt", "rgb24",
-    "-s", f"{W}x{H}",
-    "-r", str(FPS),
-    "-i", "-",
-    "-an",
-    "-c:v", "libx264",
-    "-pix_fmt", "yuv420p",
-    "-movflags", "+faststart",
-    mp4_path
-]
-
-proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-for i in range(TOTAL_FRAMES):
-    frame = draw_frame(i)
-    proc.stdin.write(frame.tobytes())
-
-proc.stdin.close()
-ret = proc.wait()
-stderr = proc.stderr.read().decode("utf-8", errors="ignore")
-if ret != 0:
-    raise RuntimeError(stderr[-2000:])
-
-(mp4_path, os.path.getsize(mp4_path))
+# Square and vertical cuts (VIDEOKIT_ASPECTS): header, both panels as one, credits. 9:16 stacks
+# the panels, except while the transition and outro cards span them.
+HEADER, BODY, CREDITS = (240, 15, 1040, 208), (20, 215, 1260, 655), (1060, 680, 1275, 718)
+STACKED = [HEADER, (20, 215, 640, 655), (640, 215, 1260, 655), CREDITS]
+REGIONS = {
+    "9:16": [(start, [HEADER, BODY, CREDITS] if phase in ("transition", "outro") else STACKED)
+             for phase, start, _ in TIMELINE.runs()],
+    "*": [HEADER, BODY, CREDITS],
+}
+
+def render():
+    OUT_DIR = "/mnt/data/dlq_video"
+    os.makedirs(OUT_DIR, exist_ok=True)
+    mp4_path = os.path.join(OUT_DIR, "dlq_simulation_v2.mp4" if VARIANT == "default" else f"dlq_simulation_v2_{VARIANT}.mp4")
+
+    # Frames are RGBA (alpha is dropped by the yuv420p conversion) and go
+    # from shared-memory slots straight into ffmpeg's stdin.
+    stats = RenderStats()
+    preview = Preview.from_env()
+    if preview is not None:
+        mp4_path = str(render_preview(mp4_path, draw_frame, TOTAL_FRAMES, (W, H), FPS, preview,
+                                      TIMELINE.runs(), key_fn=frame_key, stats=stats))
+    else:
+        with StillCapture(mp4_path, (W, H), TOTAL_FRAMES, draw_frame, TIMELINE.runs()) as stills:
+            with open_writer(mp4_path, (W, H), FPS, REGIONS) as writer:
+                encode_frames(stills.tee(writer), draw_frame, TOTAL_FRAMES, (W, H), key_fn=frame_key, stats=stats)
+    print(stats)
+
+    return mp4_path, os.path.getsize(mp4_path)
+
+
+if __name__ == "__main__":
+    render()
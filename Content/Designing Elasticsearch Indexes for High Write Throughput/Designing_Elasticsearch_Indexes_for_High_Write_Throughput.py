@@ -9,19 +9,30 @@ Scenes:
 5) Optimized architecture: fewer shards, refresh 30–60s, replicas=0 during ingestion, ILM Hot→Warm→Cold
 
 Run:
-  pip install pillow numpy imageio imageio-ffmpeg
+  pip install pillow numpy imageio-ffmpeg
   python index_design_animation.py
 
 Output:
   index-design-animation.mp4  (falls back to GIF if mp4 fails)
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 import numpy as np
-import imageio
 import math
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Content/, for videokit
+from videokit.arrows import curve_arrow, straight_arrow
+from videokit.backgrounds import canvas
+from videokit.fonts import load
+from videokit.gif import write_gif
+from videokit.runner import RenderStats
+from videokit.segments import SegmentCache, code_fingerprint, render_segments
+from videokit.sprites import blit_text, sprite_report
+from videokit.textlayout import layout_report, text_size, wrap
+from videokit.timeline import Timeline
+
 # ----------------------------
 # Canvas / timing
 # ----------------------------
@@ -35,13 +46,9 @@ SCENES = [
     ("scene4", 10.0),
     ("scene5", 5.0),
 ]
-SCENE_START = {}
-_acc = 0.0
-for name, dur in SCENES:
-    SCENE_START[name] = _acc
-    _acc += dur
-TOTAL_DUR = _acc
-TOTAL_FRAMES = int(TOTAL_DUR * FPS)
+TIMELINE = Timeline(SCENES, FPS)
+TOTAL_DUR = TIMELINE.duration
+TOTAL_FRAMES = TIMELINE.n_frames
 
 # ----------------------------
 # Colors
@@ -78,10 +85,7 @@ def load_font(size, bold=False):
         "/System/Library/Fonts/Supplemental/Arial.ttf",
         "/Library/Fonts/Arial.ttf",
     ]
-    for p in candidates:
-        if Path(p).exists():
-            return ImageFont.truetype(p, size=size)
-    return ImageFont.load_default()
+    return load(candidates, size)
 
 # Larger fonts as requested
 FONT_TITLE = load_font(44, bold=True)
@@ -113,38 +117,17 @@ def ease_in(t):
     return t * t
 
 def gradient_bg():
-    img = Image.new("RGB", (W, H), BG_TOP)
-    px = img.load()
-    for y in range(H):
-        t = y / (H - 1)
-        r = int(lerp(BG_TOP[0], BG_BOTTOM[0], t))
-        g = int(lerp(BG_TOP[1], BG_BOTTOM[1], t))
-        b = int(lerp(BG_TOP[2], BG_BOTTOM[2], t))
-        for x in range(W):
-            px[x, y] = (r, g, b)
-    return img
+    return canvas((W, H), (BG_TOP, BG_BOTTOM), mode="RGBA")
 
 def rounded(draw, box, radius=18, fill=None, outline=None, width=2):
     draw.rounded_rectangle(box, radius=radius, fill=fill, outline=outline, width=width)
 
 def measure_text(draw, text, font):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    return (bbox[2] - bbox[0], bbox[3] - bbox[1])
+    # Cached per (text, font); `draw` is kept so call sites read as before.
+    return text_size(text, font)
 
 def wrap_text(draw, text, font, max_w):
-    words = text.split()
-    if not words:
-        return [""]
-    lines, cur = [], words[0]
-    for w in words[1:]:
-        trial = cur + " " + w
-        if measure_text(draw, trial, font)[0] <= max_w:
-            cur = trial
-        else:
-            lines.append(cur)
-            cur = w
-    lines.append(cur)
-    return lines
+    return list(wrap(text, font, max_w)[0])
 
 def draw_text_box(draw, box, title, body, accent=BLUE):
     x1, y1, x2, y2 = box
@@ -156,18 +139,18 @@ def draw_text_box(draw, box, title, body, accent=BLUE):
     cx1, cy1 = x1 + pad + 12, y1 + pad
     max_w = (x2 - x1) - (pad * 2) - 12
 
-    draw.text((cx1, cy1), title, fill=TEXT, font=FONT_H2)
+    blit_text(draw, (cx1, cy1), title, fill=TEXT, font=FONT_H2)
     title_h = measure_text(draw, title, FONT_H2)[1]
     cy = cy1 + title_h + 10
 
     lines = wrap_text(draw, body, FONT_BODY, max_w)
     for ln in lines:
-        draw.text((cx1, cy), ln, fill=MUTED, font=FONT_BODY)
+        blit_text(draw, (cx1, cy), ln, fill=MUTED, font=FONT_BODY)
         cy += measure_text(draw, ln, FONT_BODY)[1] + 6
 
 def center_text(draw, xy, text, font, fill):
     tw, th = measure_text(draw, text, font)
-    draw.text((xy[0] - tw / 2, xy[1] - th / 2), text, font=font, fill=fill)
+    blit_text(draw, (xy[0] - tw / 2, xy[1] - th / 2), text, font=font, fill=fill)
 
 def draw_node(draw, cx, cy, w, h, label, color=GREEN, glow=0.0, pulse=0.0):
     # keep label safely inside
@@ -189,47 +172,25 @@ def draw_node(draw, cx, cy, w, h, label, color=GREEN, glow=0.0, pulse=0.0):
         font = FONT_SMALL
     center_text(draw, (cx, cy), label, font, TEXT)
 
-def quad_curve_points(p0, p1, p2, steps=60):
-    pts = []
-    for i in range(steps + 1):
-        t = i / steps
-        x = (1 - t) ** 2 * p0[0] + 2 * (1 - t) * t * p1[0] + t ** 2 * p2[0]
-        y = (1 - t) ** 2 * p0[1] + 2 * (1 - t) * t * p1[1] + t ** 2 * p2[1]
-        pts.append((x, y))
-    return pts
-
 def draw_arrow(draw, p0, p2, color=GREEN, width=6, curve=0.0, arrow_size=16, alpha=1.0):
     # curve uses p1 shifted upward
     if curve != 0.0:
         mx, my = (p0[0] + p2[0]) / 2, (p0[1] + p2[1]) / 2
         p1 = (mx, my - 140 * curve)
-        pts = quad_curve_points(p0, p1, p2, steps=70)
-        for i in range(len(pts) - 1):
-            draw.line([pts[i], pts[i + 1]], fill=color, width=width)
-        x2, y2 = pts[-1]
-        x1, y1 = pts[-2]
+        curve_arrow(draw, p0, p1, p2, color, width=width, head=arrow_size, steps=70)
     else:
-        draw.line([p0, p2], fill=color, width=width)
-        x2, y2 = p2
-        x1, y1 = p0
-
-    ang = math.atan2(y2 - y1, x2 - x1)
-    L = arrow_size
-    pA = (x2, y2)
-    pB = (x2 - L * math.cos(ang - 0.4), y2 - L * math.sin(ang - 0.4))
-    pC = (x2 - L * math.cos(ang + 0.4), y2 - L * math.sin(ang + 0.4))
-    draw.polygon([pA, pB, pC], fill=color)
+        straight_arrow(draw, p0, p2, color, width=width, head=arrow_size)
 
 def badge(draw, x, y, text, color=GREEN):
     pad_x, pad_y = 14, 8
     tw, th = measure_text(draw, text, FONT_BADGE)
     box = (x, y, x + tw + 2 * pad_x, y + th + 2 * pad_y)
     rounded(draw, box, radius=16, fill=(248, 248, 248), outline=color, width=2)
-    draw.text((x + pad_x, y + pad_y), text, fill=TEXT, font=FONT_BADGE)
+    blit_text(draw, (x + pad_x, y + pad_y), text, fill=TEXT, font=FONT_BADGE)
 
 def meter(draw, x, y, w, h, label, value01, color=AMBER):
     rounded(draw, (x, y, x + w, y + h), radius=14, fill=(248, 248, 248), outline=OUTLINE, width=2)
-    draw.text((x + 14, y + 10), label, fill=MUTED, font=FONT_SMALL)
+    blit_text(draw, (x + 14, y + 10), label, fill=MUTED, font=FONT_SMALL)
     bar_y = y + 46
     bar_h = h - 62
     rounded(draw, (x + 14, bar_y, x + w - 14, bar_y + bar_h), radius=12, fill=(230, 230, 230), outline=OUTLINE, width=2)
@@ -240,7 +201,7 @@ def popup(draw, x, y, text, color=RED):
     tw, th = measure_text(draw, text, FONT_BODY)
     box = (x, y, x + tw + 28, y + th + 18)
     rounded(draw, box, radius=16, fill=(248, 248, 248), outline=color, width=2)
-    draw.text((x + 14, y + 8), text, fill=TEXT, font=FONT_BODY)
+    blit_text(draw, (x + 14, y + 8), text, fill=TEXT, font=FONT_BODY)
 
 def safe_clip(v, lo, hi):
     return max(lo, min(hi, v))
@@ -469,13 +430,13 @@ def draw_scene4(draw, local_t):
         # text (wrapped, stays inside)
         tx = bx + 190
         ty = by + 22
-        draw.text((tx, ty), title, fill=TEXT, font=FONT_H2)
+        blit_text(draw, (tx, ty), title, fill=TEXT, font=FONT_H2)
 
         max_w = (bx + cw) - tx - 20
         lines = wrap_text(draw, body, FONT_BODY, max_w)
         yy = ty + measure_text(draw, title, FONT_H2)[1] + 8
         for ln in lines[:2]:
-            draw.text((tx, yy), ln, fill=MUTED, font=FONT_BODY)
+            blit_text(draw, (tx, yy), ln, fill=MUTED, font=FONT_BODY)
             yy += measure_text(draw, ln, FONT_BODY)[1] + 6
 
         # subtle active outline pulse
@@ -485,6 +446,17 @@ def draw_scene4(draw, local_t):
 
     center_text(draw, (W/2, 660), "Fix these, and your write throughput usually jumps without any hardware changes.", FONT_BODY, MUTED)
 
+ILM_TRACK = (80, 520, 640, 610)
+PILL_W = 150
+
+def ilm_dot(local_t):
+    # Active ILM phase and the progress dot's x; the dot parks at the end of "Cold".
+    prog = ease_in_out(local_t / 5.0)
+    i = min(2, int(prog * 3.0))
+    x0 = ILM_TRACK[0] + 18 + i * (PILL_W + 18)
+    dotx = x0 + 18 + (PILL_W - 36) * (prog * 3.0 - i)
+    return i, safe_clip(dotx, x0 + 18, x0 + PILL_W - 18)
+
 def draw_scene5(draw, local_t):
     center_text(draw, (W/2, 90), "Optimized Setup (Write-Friendly)", FONT_TITLE, TEXT)
     nodes = layout_nodes()
@@ -503,25 +475,22 @@ def draw_scene5(draw, local_t):
     )
 
     # ILM phase track (animated)
-    tx1, ty1, tx2, ty2 = 80, 520, 640, 610
+    tx1, ty1, tx2, ty2 = ILM_TRACK
     rounded(draw, (tx1, ty1, tx2, ty2), radius=22, fill=PANEL, outline=OUTLINE, width=2)
-    draw.text((tx1 + 18, ty1 + 16), "ILM Phases", fill=TEXT, font=FONT_H2)
+    blit_text(draw, (tx1 + 18, ty1 + 16), "ILM Phases", fill=TEXT, font=FONT_H2)
 
     # phases as pills
     phases = [("Hot", RED), ("Warm", AMBER), ("Cold", BLUE)]
     px = tx1 + 18
     py = ty1 + 68
-    prog = ease_in_out(local_t / 5.0)
-    active_idx = min(2, int(prog * 3.0))
+    active_idx, dotx = ilm_dot(local_t)
     for i, (nm, c) in enumerate(phases):
-        pill_w = 150
+        pill_w = PILL_W
         box = (px + i * (pill_w + 18), py, px + i * (pill_w + 18) + pill_w, py + 44)
         rounded(draw, box, radius=18, fill=(255, 255, 255), outline=c, width=3)
         center_text(draw, ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2), nm, FONT_BODY, TEXT)
         if i == active_idx:
             # moving dot indicating progression
-            dotx = box[0] + 18 + (pill_w - 36) * (prog * 3.0 - i)
-            dotx = safe_clip(dotx, box[0] + 18, box[2] - 18)
             draw.ellipse((dotx - 7, py + 20 - 7, dotx + 7, py + 20 + 7), fill=GREEN)
 
     badge(draw, 80, 170, "Outcome: stable writes, fresher dashboards", color=GREEN)
@@ -529,50 +498,87 @@ def draw_scene5(draw, local_t):
 # ----------------------------
 # Frame composer
 # ----------------------------
-def make_frame(t):
+SCENE_DRAW = {
+    "scene1": draw_scene1,
+    "scene2": draw_scene2,
+    "scene3": draw_scene3,
+    "scene4": draw_scene4,
+    "scene5": draw_scene5,
+}
+
+def frame_image(t):
     img = gradient_bg()
     draw = ImageDraw.Draw(img)
 
     # Scene routing
-    if SCENE_START["scene1"] <= t < SCENE_START["scene2"]:
-        local = t - SCENE_START["scene1"]
-        draw_scene1(draw, local)
-    elif SCENE_START["scene2"] <= t < SCENE_START["scene3"]:
-        local = t - SCENE_START["scene2"]
-        draw_scene2(draw, local)
-    elif SCENE_START["scene3"] <= t < SCENE_START["scene4"]:
-        local = t - SCENE_START["scene3"]
-        draw_scene3(draw, local)
-    elif SCENE_START["scene4"] <= t < SCENE_START["scene5"]:
-        local = t - SCENE_START["scene4"]
-        draw_scene4(draw, local)
-    else:
-        local = t - SCENE_START["scene5"]
-        draw_scene5(draw, local)
+    name, local, _ = TIMELINE.at(t)
+    SCENE_DRAW[name](draw, local)
 
     # credits
     credits = "video credits: Chaitanya Pothuraju"
     tw, th = measure_text(draw, credits, FONT_BODY)
-    draw.text((W - tw - 24, H - th - 18), credits, fill=MUTED, font=FONT_BODY)
+    blit_text(draw, (W - tw - 24, H - th - 18), credits, fill=MUTED, font=FONT_BODY)
+
+    return img
+
+def make_frame(t):
+    return np.array(frame_image(t).convert("RGB"))
 
-    return np.array(img)
+def frame_key(i):
+    # Everything frame i depends on, where that is less than its exact time.
+    name, local, _ = TIMELINE.frame(i)
+    if name == "scene1":
+        return ("scene1",)  # title card ignores local time
+    if name == "scene5":
+        return ("scene5",) + ilm_dot(local)
+    return None
 
 # ----------------------------
 # Render
 # ----------------------------
-out_mp4 = "index-design-animation.mp4"
-out_gif = "index-design-animation.gif"
-
-mp4_written = False
-try:
-    writer = imageio.get_writer(out_mp4, fps=FPS, codec="libx264", quality=8)
-    for i in range(TOTAL_FRAMES):
-        tt = i / FPS
-        writer.append_data(make_frame(tt))
-    writer.close()
-    mp4_written = True
-except Exception as e:
-    frames = [make_frame(i / FPS) for i in range(TOTAL_FRAMES)]
-    imageio.mimsave(out_gif, frames, fps=12)
-
-print("Created:", out_mp4 if mp4_written else out_gif)
+# Square and vertical cuts (VIDEOKIT_ASPECTS): each scene's parts stacked top to bottom. 9:16
+# also splits the pipeline in two rows; the narrower cuts keep it whole.
+TITLE, FOOTER, CREDITS = (40, 65, 1240, 125), (90, 640, 1190, 682), (830, 678, 1265, 714)
+PIPE, PIPE_L, PIPE_R = (50, 270, 1215, 372), (50, 270, 645, 372), (635, 270, 1215, 372)
+
+def scene_rows(pipe):
+    return {
+        "scene1": [(0, 65, 1280, 160)] + pipe + [(60, 570, 320, 630), CREDITS],
+        "scene2": [TITLE] + pipe + [((30, 410, 310, 600), (750, 510, 1045, 668)), CREDITS],
+        "scene3": [TITLE] + pipe + [(250, 390, 1030, 605), FOOTER, CREDITS],
+        "scene4": [TITLE, (70, 150, 650, 297), (660, 150, 1240, 297), (70, 305, 650, 452),
+                   (660, 305, 1240, 452), FOOTER, CREDITS],
+        "scene5": [TITLE, (70, 160, 670, 215)] + pipe + [(70, 510, 650, 640), (710, 420, 1250, 680), CREDITS],
+    }
+
+REGIONS = {
+    aspect: [(start, rows[name]) for name, start, _ in TIMELINE.runs()]
+    for aspect, rows in (("9:16", scene_rows([PIPE_L, PIPE_R])), ("*", scene_rows([PIPE])))
+}
+
+def render():
+    out_mp4 = "index-design-animation.mp4"
+    out_gif = "index-design-animation.gif"
+
+    mp4_written = False
+    try:
+        # Each scene is encoded once per change of its draw function and cached next to this script
+        stats = RenderStats()
+        scene_fns = tuple(f.__name__ for f in SCENE_DRAW.values())
+        cache = SegmentCache(Path(__file__).resolve().parent / ".videokit-cache",
+                             code_fingerprint(__file__, globals(), exclude=("SCENES",) + scene_fns))
+        segments = [(name, start, stop, (name, SCENE_DRAW[name])) for name, start, stop in TIMELINE.runs()]
+        out_mp4 = render_segments(out_mp4, lambda i: frame_image(i / FPS), segments, (W, H), FPS, cache,
+                                  key_fn=frame_key, crf=10, stats=stats, regions=REGIONS)
+        mp4_written = True
+        print(stats)
+        print(layout_report())
+        print(sprite_report())
+    except Exception as e:
+        write_gif(out_gif, lambda i: frame_image(i / FPS), TOTAL_FRAMES, FPS, key_fn=frame_key)
+
+    print("Created:", out_mp4 if mp4_written else out_gif)
+
+
+if __name__ == "__main__":
+    render()
@@ -1,14 +1,20 @@
 import math
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-from moviepy import (
-    TextClip, CompositeVideoClip, ColorClip, ImageClip, concatenate_videoclips
-)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Content/, for videokit
+from videokit.fonts import face, find
+from videokit.runner import RenderStats
+from videokit.segments import SegmentCache, code_fingerprint, render_segments
+from videokit.slides import Slide, Sprite, Tint
+from videokit.timeline import Timeline
 
 W, H = 1280, 720
+FPS = 24
 BG_COLOR = (255, 255, 255)
 
 def pick_font(bold=False):
@@ -28,10 +34,7 @@ def pick_font(bold=False):
         "/System/Library/Fonts/Supplemental/Helvetica.ttf",
         "/Library/Fonts/Helvetica.ttf",
     ]
-    for p in candidates:
-        if Path(p).exists():
-            return p
-    return None
+    return find(*candidates)
 
 FONT_BOLD = pick_font(bold=True)
 FONT_REGULAR = pick_font(bold=False)
@@ -41,10 +44,7 @@ def pick_emoji_font():
         "/System/Library/Fonts/Apple Color Emoji.ttc",
         "/System/Library/Fonts/Apple Color Emoji.ttf",
     ]
-    for p in candidates:
-        if Path(p).exists():
-            return p
-    return None
+    return find(*candidates)
 
 FONT_EMOJI = pick_emoji_font()
 
@@ -63,20 +63,13 @@ def animated_y(base_y, t, start=0.0, travel=28, dur=0.6):
 def bob_y(base_y, t, amp=6, speed=3.5):
     return base_y + amp * math.sin(t * speed)
 
+@lru_cache(maxsize=None)
 def load_font(font_path, font_size):
-    if not font_path:
-        return ImageFont.load_default()
-    try:
-        return ImageFont.truetype(font_path, font_size)
-    except OSError:
-        if font_path.endswith(".ttc"):
+    # Bitmap emoji fonts only open at fixed sizes; the fallback is worked out once per font.
+    if font_path:
+        for size in (font_size, 64, 56, 48):
             try:
-                return ImageFont.truetype(font_path, font_size, index=0)
-            except OSError:
-                pass
-        for alt_size in (64, 56, 48):
-            try:
-                return ImageFont.truetype(font_path, alt_size)
+                return face(font_path, size)
             except OSError:
                 continue
     return ImageFont.load_default()
@@ -95,6 +88,14 @@ def render_text_image(text, font_path, font_size, color, pad=8):
     draw.text((pad, pad), text, font=font, fill=color)
     return np.array(img)
 
+def text_sprite(pos, start=0.0, end=None, **text_args):
+    # moviepy lays the caption out and rasterizes it once; frames only blit the result.
+    from moviepy import TextClip
+
+    clip = TextClip(**text_args)
+    alpha = (clip.mask.get_frame(0) * 255).astype("uint8")
+    return Sprite(clip.get_frame(0).astype("uint8"), alpha, pos, start, end)
+
 def slide(
     text,
     subtext=None,
@@ -105,12 +106,10 @@ def slide(
     emoji_color="#111111",
     effect=None,
 ):
-    clips = []
-
-    bg = ColorClip(size=(W, H), color=BG_COLOR, duration=duration)
-    clips.append(bg)
+    layers = []
 
-    main = TextClip(
+    main = text_sprite(
+        lambda t: ("center", animated_y(H * 0.40, t, start=0.0, travel=36, dur=0.7)),
         text=text,
         font=FONT_BOLD,
         font_size=74,
@@ -119,14 +118,15 @@ def slide(
         size=(W - 220, None),
         margin=(12, 12),
         text_align="center",
-    ).with_position(
-        lambda t: ("center", animated_y(H * 0.40, t, start=0.0, travel=36, dur=0.7))
-    ).with_duration(duration)
+    )
 
-    clips.append(main)
+    layers.append(main)
 
     if subtext:
-        sub = TextClip(
+        sub = text_sprite(
+            lambda t: ("center", animated_y(H * 0.62, t, start=0.2, travel=26, dur=0.7)),
+            start=0.2,
+            end=duration,
             text=subtext,
             font=FONT_REGULAR,
             font_size=34,
@@ -135,10 +135,8 @@ def slide(
             size=(W - 260, None),
             margin=(10, 10),
             text_align="center",
-        ).with_position(
-            lambda t: ("center", animated_y(H * 0.62, t, start=0.2, travel=26, dur=0.7))
-        ).with_start(0.2).with_duration(duration - 0.2)
-        clips.append(sub)
+        )
+        layers.append(sub)
 
     if emoji:
         emoji_img = render_text_image(
@@ -148,30 +146,19 @@ def slide(
             emoji_color,
             pad=10,
         )
-        emoji_clip = ImageClip(emoji_img)
         if effect == "bounce":
-            emoji_clip = emoji_clip.with_position(
-                lambda t: (W * 0.15, animated_y(H * 0.20, t, start=0.1, travel=18, dur=0.5))
-            )
+            emoji_pos = lambda t: (W * 0.15, animated_y(H * 0.20, t, start=0.1, travel=18, dur=0.5))
         elif effect == "pulse":
-            emoji_clip = emoji_clip.with_position(
-                lambda t: (W * 0.12, bob_y(H * 0.18, t, amp=10, speed=5.0))
-            )
+            emoji_pos = lambda t: (W * 0.12, bob_y(H * 0.18, t, amp=10, speed=5.0))
         else:
-            emoji_clip = emoji_clip.with_position((W * 0.12, H * 0.18))
-        emoji_clip = emoji_clip.with_duration(duration)
-        clips.append(emoji_clip)
+            emoji_pos = (W * 0.12, H * 0.18)
+        layers.append(Sprite.from_rgba(emoji_img, emoji_pos))
 
     if effect == "flash":
-        flash = ColorClip(size=(W, H), color=(255, 255, 255), duration=0.2)
-        flash = flash.with_opacity(0.22)
-        flash = flash.with_start(0.05)
-        clips.append(flash)
+        layers.append(Tint((255, 255, 255), int(0.22 * 255), start=0.05, end=0.05 + 0.2))
 
     if effect == "glow":
-        glow = ColorClip(size=(W, H), color=(255, 255, 255), duration=duration)
-        glow = glow.with_opacity(0.08)
-        clips.append(glow)
+        layers.append(Tint((255, 255, 255), int(0.08 * 255)))
 
     copyright_img = render_text_image(
         "Copyright © Chaitanya Pothuraju",
@@ -180,63 +167,63 @@ def slide(
         "#777777",
         pad=6,
     )
-    copyright_clip = ImageClip(copyright_img).with_duration(duration)
-    copyright_clip = copyright_clip.with_position(
-        (W - copyright_clip.w - 20, H - copyright_clip.h - 16)
-    )
-    clips.append(copyright_clip)
+    copyright_h, copyright_w = copyright_img.shape[:2]
+    layers.append(Sprite.from_rgba(copyright_img, (W - copyright_w - 20, H - copyright_h - 16)))
+
+    return Slide((W, H), BG_COLOR, duration, layers)
 
-    return CompositeVideoClip(clips)
 
-slides = [
-    slide(
-        "OVERSHARDING",
-        "The Elasticsearch mistake everyone makes (once)",
-        4,
+# One entry per slide, as slide() arguments. Each is its own cached segment, so
+# editing one entry re-encodes only that slide.
+SLIDES = [
+    dict(
+        text="OVERSHARDING",
+        subtext="The Elasticsearch mistake everyone makes (once)",
+        duration=4,
         color="#0A3D62",
         emoji="⚠️",
         emoji_color="#F4B400",
         effect="glow",
     ),
-    slide(
-        "“We need more shards to scale”",
-        "More shards = more parallelism",
-        4,
+    dict(
+        text="“We need more shards to scale”",
+        subtext="More shards = more parallelism",
+        duration=4,
         color="#1E6091",
         emoji="🚀",
         emoji_color="#2E86C1",
         effect="bounce",
     ),
-    slide(
-        "1 index × 20 shards × 30 days",
-        "= 600 Lucene indexes",
-        5,
+    dict(
+        text="1 index × 20 shards × 30 days",
+        subtext="= 600 Lucene indexes",
+        duration=5,
         color="#B45309",
         emoji="🧱",
         emoji_color="#8D5524",
         effect="pulse",
     ),
-    slide(
-        "More shards ≠ more throughput",
-        "More shards = more overhead",
-        5,
+    dict(
+        text="More shards ≠ more throughput",
+        subtext="More shards = more overhead",
+        duration=5,
         color="#C1121F",
         emoji="🔥",
         emoji_color="#E63946",
         effect="flash",
     ),
-    slide(
-        "Elasticsearch spends more time\nmanaging shards\nthan indexing data",
+    dict(
+        text="Elasticsearch spends more time\nmanaging shards\nthan indexing data",
         duration=5,
         color="#6C5CE7",
         emoji="⏱️",
         emoji_color="#6C5CE7",
         effect="pulse",
     ),
-    slide(
-        "TARGET 20–50 GB PER SHARD",
-        "Fewer shards win",
-        4,
+    dict(
+        text="TARGET 20–50 GB PER SHARD",
+        subtext="Fewer shards win",
+        duration=4,
         color="#2A9D8F",
         emoji="✅",
         emoji_color="#2E7D32",
@@ -244,10 +231,47 @@ slides = [
     ),
 ]
 
-final = concatenate_videoclips(slides, method="compose")
-final.write_videofile(
-    "elasticsearch_oversharding_explainer.mp4",
-    fps=24,
-    codec="libx264",
-    audio=False
-)
+
+@lru_cache(maxsize=1)
+def timeline():
+    """All slides back to back, built on first use (text_sprite() imports moviepy)."""
+    slides = [slide(**spec) for spec in SLIDES]
+    # Slides are numbered from 1 for VIDEOKIT_PREVIEW="scene=N" and VIDEOKIT_RERENDER=N
+    for k, card in enumerate(slides, 1):
+        card.name = str(k)
+    return Timeline([(card, card.duration) for card in slides], FPS)
+
+
+def frame_image(time_s):
+    card, local_t, _ = timeline().at(time_s)
+    return Image.fromarray(card.frame(local_t))
+
+
+def frame_key(i):
+    card, local_t, _ = timeline().frame(i)
+    return card.name, card.key(local_t)
+
+
+# Square and vertical cuts (VIDEOKIT_ASPECTS): each slide's icon and text, and the copyright line;
+# 9:16 puts the icon on a row of its own above the text
+ICON, TEXT, CREDITS = (140, 140, 260, 225), (110, 290, 1170, 650), (905, 672, 1265, 712)
+REGIONS = {"9:16": [ICON, TEXT, CREDITS], "*": [(110, 130, 1170, 650), CREDITS]}
+
+
+def render():
+    # Slides are encoded in parallel, one per worker, with the same encoder settings,
+    # then stream-copied together; unchanged slides come from the cache next to this script.
+    stats = RenderStats()
+    cache = SegmentCache(Path(__file__).resolve().parent / ".videokit-cache",
+                         code_fingerprint(__file__, globals(), exclude=("SLIDES",), packages=("moviepy",)))
+    fonts = (FONT_BOLD, FONT_REGULAR, FONT_EMOJI)
+    segments = [(str(card), start, stop, (spec, fonts))
+                for spec, (card, start, stop) in zip(SLIDES, timeline().runs())]
+    out_mp4 = render_segments("elasticsearch_oversharding_explainer.mp4", lambda i: frame_image(i / FPS),
+                              segments, (W, H), FPS, cache, key_fn=frame_key, stats=stats, regions=REGIONS)
+    print(stats)
+    return out_mp4
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,493 @@
+"""Scene engine for the "What We Thought Would Change vs What Actually Did" videos.
+
+Scaling_from_10K_to_10M_Events_Day_v1.py and _v2.py are two configs of this
+engine. Both play the same scenes through the same state builders; a
+config picks the fonts and, per scene mode, a View: the layout its nodes
+come from, the state builder its widgets read, and its elements in draw
+order:
+
+    Box("kafka", "Kafka Topic", accent=BLUE)          node
+    Arrow("source", "kafka")                          edge, pulsing with time
+    Curve("es", "dash", bend=80)                      curved edge
+    Text((40, 160), "Scene: {name}", TEXT, "sub")     fixed text, formatted with the scene
+    Label("es", (12, 94), lambda s: ..., "small")     text drawn from the state
+    Widget(draw_es_meter, "es", ("es_meter",))        draw_es_meter(draw, xy, state["es_meter"])
+    Status((40, 200), "sub")                          the state's status line
+
+Nodes are named in the view's layout or given as an (x, y, w, h) rect.
+Offsets are from a node's top-left corner (negative ones from its right or
+bottom edge). Text goes through the sprite cache, counters included: a
+scene repeats most of its values, so glyphs are rasterized once per value. Each scene's view is compiled once into a videokit.plan.Plan:
+nodes, edges and text that nothing per-frame overlaps go into the scene's
+cached layer, and a frame only paints the pulsing arrows and the state
+widgets. Scenes whose plan reads the state but not the pulse get a hold
+key from the state, so their repeated frames are encoded once.
+hires_image() replays a scene's plan through a videokit.hires.ScaledDraw
+for 2x stills (VIDEOKIT_STILLS="scale=2").
+"""
+import math
+from collections import namedtuple
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from videokit.arrows import curve_arrow, quad_bezier, straight_arrow
+from videokit.backgrounds import canvas, layer
+from videokit.compositor import LayeredCanvas
+from videokit.gif import write_gif
+from videokit.hires import ScaledDraw
+from videokit.plan import Op, Plan
+from videokit.runner import RenderStats
+from videokit.segments import SegmentCache, code_fingerprint, render_segments
+from videokit.sprites import blit_text
+from videokit.timeline import Timeline
+
+W, H = 1280, 720
+BG_TOP = (10, 16, 31)
+BG_BOTTOM = (14, 22, 42)
+PANEL = (20, 28, 50)
+TEXT = (235, 200, 207)
+MUTED = (168, 180, 205)
+TEAL = (0, 207, 173)
+BLUE = (47, 146, 255)
+PURPLE = (164, 116, 255)
+AMBER = (255, 176, 0)
+CYAN = (0, 212, 255)
+ERR = (255, 90, 95)
+WARN = (208, 193, 70)
+OUTLINE = (50, 80, 140)
+SHADOW = (8, 12, 22)
+FADED = (60, 60, 60)
+FADED_PANEL = (24, 24, 24)
+
+# Layouts
+layout_after = {
+    "source": (80, 315, 220, 90),      # App
+    "kafka": (330, 300, 340, 120),
+    "consumers": (700, 300, 340, 120),
+    "es": (1080, 300, 180, 120),
+    "dash": (1050, 470, 210, 100),
+}
+layout_before = {
+    "app": (80, 315, 220, 90),
+    "logstash": (420, 300, 260, 120),
+    "es": (780, 300, 220, 120),
+    "dash": (760, 470, 240, 100),
+}
+
+# Scenes — ordered
+scenes = [
+    {"name": "Title", "dur": 2.0, "mode": "title"},
+    {"name": "Before — 10K/day", "dur": 4.0, "mode": "before", "events": 10000},
+    {"name": "Before — Spike hits", "dur": 5.0, "mode": "before", "events": 200000},
+    {"name": "Shift — Insert Kafka buffer", "dur": 3.0, "mode": "transition"},
+    {"name": "After — Baseline", "dur": 4.0, "mode": "after", "lag_target": 0},
+    {"name": "After — Peak load", "dur": 5.0, "mode": "after", "lag_target": 120_000},
+    {"name": "After — Hot Partition", "dur": 5.0, "mode": "after", "lag_target": 500_000},
+    {"name": "After — Downstream Slow", "dur": 5.0, "mode": "after", "lag_target": 220_000},
+    {"name": "After — Retry Storm", "dur": 5.0, "mode": "after", "lag_target": 800_000},
+    {"name": "Observability — What we debug", "dur": 4.0, "mode": "obs"},
+    {"name": "Closing", "dur": 2.0, "mode": "closing"},
+]
+
+FPS = 20
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+# State builders
+def before_state(name, t_rel, dur, events):
+    prog = t_rel/dur if dur > 0 else 1.0
+    state = {
+        "events": events,
+        "es_meter": 0.20,
+        "dash_stale": False,
+        "dash_delay": 0,
+        "gc_pause": 0.0,
+        "retry_rate": 0.0,
+        "status": ("STEADY", "10K/day — Fast dashboards, low CPU, no alerts."),
+    }
+    if "Spike" in name:
+        state["es_meter"] = lerp(0.3, 0.95, prog)
+        state["gc_pause"] = lerp(5, 180, prog)  # ms
+        state["retry_rate"] = lerp(0.0, 0.18, prog)  # fraction
+        state["dash_stale"] = True
+        state["dash_delay"] = int(lerp(0, 45, prog))
+        state["status"] = ("ERROR", "Spike without buffer — ES throttles; retries cascade.")
+    return state
+
+def after_state(name, t_rel, dur):
+    state = {
+        "src_rate": 1000,
+        "part_fill": [0.10]*6,
+        "part_hot": [False]*6,
+        "cons_state": ["steady"]*6,
+        "cons_bar": [0.25]*6,
+        "es_meter": 0.20,
+        "dash_stale": False,
+        "dash_delay": 0.0,
+        "lag": 0,
+        "status": ("STEADY", "Buffered ingestion. Balanced production & consumption."),
+    }
+    prog = t_rel/dur if dur > 0 else 1.0
+    if "Peak" in name:
+        state["src_rate"] = 8000
+        state["part_fill"] = [lerp(0.1, 0.6, prog)]*6
+        state["dash_stale"] = True
+        state["status"] = ("WARN", "Peak load. Lag rises; downstream throughput is capped.")
+        state["lag"] = int(lerp(0, 120_000, prog))
+    elif "Hot Partition" in name:
+        state["src_rate"] = 5000
+        fills = [0.15]*6; fills[2] = lerp(0.2, 0.95, prog)
+        state["part_fill"] = fills
+        hot = [False]*6; hot[2] = True
+        state["part_hot"] = hot
+        cons = ["steady"]*6; cons[2] = "block"
+        state["cons_state"] = cons
+        bars = [0.25]*6; bars[2] = 0.05
+        state["cons_bar"] = bars
+        state["status"] = ("ERROR", "Hot partition — one consumer bottlenecks; more consumers don’t help.")
+        state["lag"] = int(lerp(0, 500_000, prog))
+    elif "Downstream Slow" in name:
+        state["cons_state"] = ["wait"]*6
+        state["cons_bar"] = [0.10]*6
+        state["es_meter"] = lerp(0.2, 0.95, prog)
+        state["dash_stale"] = True
+        state["dash_delay"] = lerp(0, 45, prog)
+        state["status"] = ("ERROR", "Downstream slow — ES throttles; consumers apply backpressure.")
+        state["lag"] = int(lerp(0, 220_000, prog))
+    elif "Retry Storm" in name:
+        cons = []
+        bars = []
+        for i in range(6):
+            if i % 2 == 0:
+                cons.append("block"); bars.append(lerp(0.25, 0.05, prog))
+            else:
+                cons.append("wait"); bars.append(lerp(0.25, 0.12, prog))
+        state["cons_state"] = cons
+        state["cons_bar"] = bars
+        state["status"] = ("ERROR", "Retry storm — duplicates amplify load; lag is a side effect.")
+        state["lag"] = int(lerp(0, 800_000, prog))
+    return state
+
+def scene_before_state(s, t_rel):
+    return before_state(s["name"], t_rel, s["dur"], s.get("events", 0))
+
+def scene_after_state(s, t_rel):
+    return after_state(s["name"], t_rel, s["dur"])
+
+# Drawing primitives
+def draw_shadowed_rounded(draw, xy, radius, fill, outline=None, width=2):
+    x, y, w, h = xy
+    draw.rounded_rectangle([x+3, y+4, x+w+3, y+h+4], radius=radius, fill=SHADOW)
+    draw.rounded_rectangle([x, y, x+w, y+h], radius=radius, fill=fill, outline=outline, width=width)
+
+def draw_box(draw, xy, title, font, outline=OUTLINE, fill=PANEL, accent=None):
+    x, y, w, h = xy
+    draw_shadowed_rounded(draw, (x, y, w, h), radius=16, fill=fill, outline=outline, width=3)
+    blit_text(draw, (x+12, y+10), title, fill=TEXT, font=font)
+    if accent:
+        draw.rounded_rectangle([x+12, y+h-12, x+w-12, y+h-8], radius=4, fill=accent)
+
+def draw_arrow(draw, x1, y1, x2, y2, color, pulse=1.0):
+    c = tuple(max(0, min(255, int(color[i]*pulse))) for i in range(3))
+    straight_arrow(draw, (x1, y1), (x2, y2), c, width=5, head=14)
+
+def draw_curve_arrow(draw, p0, p1, p2, color, width=7):
+    curve_arrow(draw, p0, p1, p2, color, width=width, head=16, steps=50)
+
+def draw_es_meter(draw, xy, level):
+    x, y, w, h = xy
+    meter_w = w - 20
+    mx = x + 12; my = y + 70
+    draw.rounded_rectangle([mx, my, mx+meter_w, my+14], radius=6, fill=(26,40,73), outline=(57,74,122), width=2)
+    meter_fill = int(meter_w * level) if level else 0
+    draw.rounded_rectangle([mx, my, mx+meter_fill, my+14], radius=6, fill=AMBER)
+    if level and level > 0.85:
+        draw.rounded_rectangle([x, y, x+w, y+h], radius=16, outline=ERR, width=3)
+
+def draw_dash_tiles(draw, xy, stale):
+    x, y, w, h = xy
+    tg = 8
+    tw = (w - 20 - 2*tg)//3
+    ty = y + 52
+    for i in range(3):
+        tx = x + 12 + i*(tw + tg)
+        draw.rounded_rectangle([tx, ty, tx+tw, ty+22], radius=6, fill=(15,26,51),
+                               outline=(OUTLINE if not stale else WARN), width=2)
+
+def severity_color(sev):
+    return TEAL if sev == "STEADY" else (WARN if sev == "WARN" else ERR)
+
+# Scene description
+Frame = namedtuple("Frame", "time t_rel pulse state")
+
+def _grow(box, pad):
+    x0, y0, x1, y1 = box
+    return (math.floor(x0 - pad), math.floor(y0 - pad), math.ceil(x1 + pad) + 1, math.ceil(y1 + pad) + 1)
+
+def _text_box(xy, text, font):
+    l, t, r, b = font.getbbox(text)
+    return _grow((xy[0] + l, xy[1] + t, xy[0] + r, xy[1] + b), 2)
+
+def _rect(layout, node):
+    return node if isinstance(node, tuple) else layout[node]
+
+def _at(layout, node, offset):
+    if node is None:
+        return offset
+    x, y, w, h = _rect(layout, node)
+    dx, dy = offset
+    return (x + dx if dx >= 0 else x + w + dx, y + dy if dy >= 0 else y + h + dy)
+
+def _rest_of_line(xy, font):
+    # Text drawn from the state can be any length: everything right of and just below its origin.
+    return _grow((xy[0], xy[1], W, xy[1] + 2*font.size), 2)
+
+@dataclass(frozen=True)
+class Box:
+    node: str
+    title: str
+    accent: tuple = None
+    outline: tuple = OUTLINE
+    fill: tuple = PANEL
+
+    def op(self, video, view, scene):
+        xy = _rect(view.layout, self.node)
+        x, y, w, h = xy
+        font = video.fonts["sub"]
+        title = _text_box((x+12, y+10), self.title, font)
+        box = (min(x, title[0]), min(y, title[1]), max(x+w+4, title[2]), max(y+h+5, title[3]))
+        return Op(lambda draw, frame: draw_box(draw, xy, self.title, font, self.outline, self.fill, self.accent),
+                  box=_grow(box, 2))
+
+@dataclass(frozen=True)
+class Arrow:
+    src: str
+    dst: str
+    color: tuple = OUTLINE
+
+    def op(self, video, view, scene):
+        xS, yS, wS, hS = _rect(view.layout, self.src)
+        xD, yD, wD, hD = _rect(view.layout, self.dst)
+        x1, y1, x2, y2 = xS+wS, yS+hS//2, xD, yD+hD//2
+        return Op(lambda draw, frame: draw_arrow(draw, x1, y1, x2, y2, self.color, frame.pulse),
+                  reads=("pulse",), box=_grow((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)), 20))
+
+@dataclass(frozen=True)
+class Curve:
+    src: str
+    dst: str
+    bend: int
+    color: tuple = OUTLINE
+
+    def op(self, video, view, scene):
+        xE, yE, wE, hE = _rect(view.layout, self.src)
+        xD, yD, wD, hD = _rect(view.layout, self.dst)
+        p0 = (xE + wE//2, yE + hE + 8)
+        p2 = (xD + wD//2, yD - 8)
+        ctrl = (max(xE, xD) + abs(xD - xE)//2 + self.bend, (p0[1] + p2[1])//2)
+        xs, ys = zip(*quad_bezier(p0, ctrl, p2))
+        return Op(lambda draw, frame: draw_curve_arrow(draw, p0, ctrl, p2, color=self.color, width=7),
+                  box=_grow((min(xs), min(ys), max(xs), max(ys)), 24))
+
+@dataclass(frozen=True)
+class Text:
+    xy: tuple
+    text: str
+    color: tuple
+    font: str
+    node: str = None
+
+    def op(self, video, view, scene):
+        xy = _at(view.layout, self.node, self.xy)
+        text = self.text.format(**scene)
+        font = video.fonts[self.font]
+        return Op(lambda draw, frame: blit_text(draw, xy, text, fill=self.color, font=font),
+                  box=_text_box(xy, text, font))
+
+@dataclass(frozen=True)
+class Credits:
+    text: str = "Credits: Chaitanya Pothuraju"
+    color: tuple = MUTED
+    font: str = "credit"
+
+    def op(self, video, view, scene):
+        font = video.fonts[self.font]
+        bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox((0, 0), self.text, font=font)
+        tw = bbox[2] - bbox[0]; th = bbox[3] - bbox[1]
+        return Text((W - tw - 20, H - th - 16), self.text, self.color, self.font).op(video, view, scene)
+
+@dataclass(frozen=True)
+class Label:
+    node: str
+    offset: tuple
+    text: object  # text(state) -> str
+    font: str = "small"
+    color: tuple = MUTED
+
+    def op(self, video, view, scene):
+        xy = _at(view.layout, self.node, self.offset)
+        font = video.fonts[self.font]
+        return Op(lambda draw, frame: blit_text(draw, xy, self.text(frame.state), fill=self.color, font=font),
+                  reads=("state",), box=_rest_of_line(xy, font))
+
+@dataclass(frozen=True)
+class Status:
+    xy: tuple
+    font: str = "sub"
+
+    def op(self, video, view, scene):
+        font = video.fonts[self.font]
+
+        def paint(draw, frame):
+            sev, msg = frame.state["status"]
+            blit_text(draw, self.xy, f"Status: {sev} — {msg}", fill=severity_color(sev), font=font)
+
+        return Op(paint, reads=("state",), box=_rest_of_line(self.xy, font))
+
+@dataclass(frozen=True)
+class Widget:
+    paint: object  # paint(draw, node_xy, *state values)
+    node: str
+    fields: tuple
+
+    def op(self, video, view, scene):
+        xy = _rect(view.layout, self.node)
+        x, y, w, h = xy
+        return Op(lambda draw, frame: self.paint(draw, xy, *(frame.state[f] for f in self.fields)),
+                  reads=("state",), box=_grow((x, y, x + w, y + h), 4))
+
+@dataclass(frozen=True)
+class View:
+    elements: list
+    layout: dict = None
+    state: object = None  # state(scene, t_rel) -> dict, for Label/Status/Widget
+
+# Elements both versions draw the same way
+BEFORE_PIPELINE = [
+    Box("app", "App", accent=TEAL),
+    Box("logstash", "Logstash", accent=BLUE),
+    Box("es", "Elasticsearch", accent=AMBER),
+    Box("dash", "Dashboards", accent=CYAN),
+    Arrow("app", "logstash"),
+    Arrow("logstash", "es"),
+    Curve("es", "dash", bend=60),
+]
+AFTER_NODES = [
+    Box("source", "App", accent=TEAL),
+    Box("kafka", "Kafka Topic", accent=BLUE),
+    Box("consumers", "Consumers (6)", accent=PURPLE),
+    Box("es", "Elasticsearch", accent=AMBER),
+    Box("dash", "Dashboards", accent=CYAN),
+]
+AFTER_PIPELINE = AFTER_NODES + [
+    Arrow("source", "kafka"),
+    Arrow("kafka", "consumers"),
+    Arrow("consumers", "es"),
+    Curve("es", "dash", bend=80),
+]
+EVENTS_PER_DAY = Label("app", (12, 58), lambda s: f"events/day: {s['events']:,}")
+EVENTS_PER_SEC = Label("source", (12, 58), lambda s: f"events/sec: {s['src_rate']:,}")
+ES_METER = Widget(draw_es_meter, "es", ("es_meter",))
+ES_LATENCY = Label("es", (12, 94), lambda s: f"Indexing latency: {int(40 + 80*s['es_meter'])}ms")
+DASH_TILES = Widget(draw_dash_tiles, "dash", ("dash_stale",))
+DASH_DELAY = Label("dash", (12, 28), lambda s: f"Delay: {int(s['dash_delay'])}s")
+TOTAL_LAG = Label("kafka", (-210, -28), lambda s: f"Total lag: {s['lag']:,}")
+
+# Square and vertical cuts (VIDEOKIT_ASPECTS): title and status, the pipeline, credits. The 9:16
+# cut stacks the pipeline in rows, which depend on the nodes of the scene's mode.
+HEADER, PIPELINE, CREDITS = (20, 20, 1280, 270), (60, 285, 1280, 590), (840, 670, 1280, 715)
+REGIONS = [HEADER, PIPELINE, CREDITS]
+SOURCE_ROW = (60, 285, 690, 440)  # App and Kafka, or App and Logstash
+AFTER_ROWS = [HEADER, SOURCE_ROW, (690, 285, 1050, 440), (1040, 285, 1280, 590), CREDITS]
+VERTICAL_ROWS = {
+    "title": [HEADER, CREDITS],
+    "before": [HEADER, SOURCE_ROW, (745, 285, 1015, 590), CREDITS],
+    "transition": AFTER_ROWS,
+    "after": AFTER_ROWS,
+    "obs": AFTER_ROWS,
+    "closing": [HEADER, CREDITS],
+}
+
+class PipelineVideo:
+    """`views` maps each scene mode to a View; `header` and `footer` frame every scene."""
+
+    def __init__(self, fonts, views, header=(), footer=(Credits(),)):
+        self.fonts = fonts
+        self.views = views
+        self.header = list(header)
+        self.footer = list(footer)
+        self.timeline = Timeline([(s, s["dur"]) for s in scenes], FPS)
+        self.canvas = LayeredCanvas(lambda: layer((W, H), (BG_TOP, BG_BOTTOM), mode="RGBA"), keep=2)
+        self._plans = {}
+
+    def plan(self, s):
+        plan = self._plans.get(s["name"])
+        if plan is None:
+            view = self.views[s["mode"]]
+            elements = self.header + list(view.elements) + self.footer
+            plan = self._plans[s["name"]] = Plan([el.op(self, view, s) for el in elements])
+        return plan
+
+    def _frame(self, s, time_s, t_rel, plan):
+        state = self.views[s["mode"]].state(s, t_rel) if "state" in plan.reads else None
+        return Frame(time_s, t_rel, 0.8 + 0.2*math.sin(2*math.pi*time_s), state)
+
+    def frame_image(self, time_s):
+        """The frame at `time_s`, drawn into a canvas reused by the next call."""
+        s, t_rel, _ = self.timeline.at(time_s)
+        plan = self.plan(s)
+        return plan.draw(self.canvas, s["name"], self._frame(s, time_s, t_rel, plan))
+
+    def hires_image(self, time_s, scale=2):
+        """The frame at `time_s` redrawn at `scale` times the size, for stills."""
+        s, t_rel, _ = self.timeline.at(time_s)
+        plan = self.plan(s)
+        img = canvas((W * scale, H * scale), (BG_TOP, BG_BOTTOM), mode="RGBA")
+        plan.paint(ScaledDraw(ImageDraw.Draw(img), scale), self._frame(s, time_s, t_rel, plan))
+        return img
+
+    def regions(self):
+        """REGIONS, with the 9:16 rows switching with each scene's mode (see videokit.aspects)."""
+        vertical = [(start, VERTICAL_ROWS[s["mode"]]) for s, start, _ in self.timeline.runs()]
+        return {"9:16": vertical, "*": REGIONS}
+
+    def make_frame(self, time_s):
+        return np.array(self.frame_image(time_s).convert("RGB"))
+
+    def frame_key(self, i):
+        # Scenes without pulsing arrows only change with their state
+        s, t_rel, _ = self.timeline.frame(i)
+        plan = self.plan(s)
+        if "pulse" in plan.reads:
+            return None
+        return (s["name"], repr(self._frame(s, i / FPS, t_rel, plan).state))
+
+    def frame_state(self, i):
+        # What the state builders contribute to frame i; the segment cache hashes this instead of their source
+        s, t_rel, _ = self.timeline.frame(i)
+        view = self.views[s["mode"]]
+        return view.state(s, t_rel) if view.state else None
+
+    def render(self, out_name, script, namespace):
+        """Encode to `out_name` next to the caller's cwd, falling back to a GIF."""
+        mp4_written = False
+        try:
+            # Each scene is encoded once per change of its inputs and cached next to the script
+            stats = RenderStats()
+            cache = SegmentCache(Path(script).resolve().parent / ".videokit-cache",
+                                 code_fingerprint(script, namespace, exclude=("scenes", "before_state", "after_state"),
+                                                  sources=(__file__,)))
+            segments = [(s["name"], start, stop, (s,)) for s, start, stop in self.timeline.runs()]
+            render_segments(f"{out_name}.mp4", lambda i: self.frame_image(i / FPS), segments, (W, H), FPS, cache,
+                            state_fn=self.frame_state, key_fn=self.frame_key, crf=10, stats=stats,
+                            regions=self.regions(), hires_fn=lambda i, scale: self.hires_image(i / FPS, scale))
+            mp4_written = True
+            print(stats)
+        except Exception:
+            write_gif(f"{out_name}.gif", lambda i: self.frame_image(i / FPS), self.timeline.n_frames, FPS,
+                      key_fn=self.frame_key)
+        print('Created:', 'MP4' if mp4_written else 'GIF')
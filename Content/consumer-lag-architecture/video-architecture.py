@@ -1,9 +1,19 @@
 
 # v3: Adjust ES→Dashboards curved link to match reference, keep v2 styling
-from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 import math
-import imageio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Content/, for videokit
+from videokit.arrows import curve_arrow, straight_arrow
+from videokit.backgrounds import layer
+from videokit.compositor import LayeredCanvas
+from videokit.fonts import load
+from videokit.gif import write_gif
+from videokit.runner import RenderStats
+from videokit.segments import SegmentCache, code_fingerprint, render_segments
+from videokit.timeline import Timeline
 
 W, H = 1280, 720
 BG_TOP = (10, 16, 31)
@@ -23,16 +33,10 @@ SHADOW = (8, 12, 22)
 LINK = (112, 189, 255)      # brighter blue for the curved link
 
 # ---- Fonts (single block) ----
-try:
-    FONT_TITLE = ImageFont.truetype("DejaVuSans.ttf", 38)
-    FONT_SUB   = ImageFont.truetype("DejaVuSans.ttf", 22)
-    FONT_SMALL = ImageFont.truetype("DejaVuSans.ttf", 18)
-    FONT_CREDIT= ImageFont.truetype("DejaVuSans.ttf", 18)
-except:
-    FONT_TITLE = ImageFont.load_default()
-    FONT_SUB   = ImageFont.load_default()
-    FONT_SMALL = ImageFont.load_default()
-    FONT_CREDIT= ImageFont.load_default()
+FONT_TITLE = load("DejaVuSans.ttf", 38)
+FONT_SUB   = load("DejaVuSans.ttf", 22)
+FONT_SMALL = load("DejaVuSans.ttf", 18)
+FONT_CREDIT= load("DejaVuSans.ttf", 18)
 
 # ---- Layout ----
 layout = {
@@ -55,26 +59,12 @@ scenes = [
     {"name": "Closing",       "dur": 2.0},
 ]
 
-scene_cum = []
-acc = 0.0
-for s in scenes:
-    scene_cum.append((acc, acc + s["dur"], s))
-    acc += s["dur"]
-TOTAL_DUR = acc
 FPS = 20
-TOTAL_FRAMES = int(TOTAL_DUR * FPS)
+TIMELINE = Timeline([(s, s["dur"]) for s in scenes], FPS)
+TOTAL_DUR = TIMELINE.duration
+TOTAL_FRAMES = TIMELINE.n_frames
 
 # ---- Helpers ----
-def gradient_bg():
-    arr = np.zeros((H, W, 3), dtype=np.uint8)
-    for y in range(H):
-        t = y/(H-1)
-        r = int(BG_TOP[0]*(1-t) + BG_BOTTOM[0]*t)
-        g = int(BG_TOP[1]*(1-t) + BG_BOTTOM[1]*t)
-        b = int(BG_TOP[2]*(1-t) + BG_BOTTOM[2]*t)
-        arr[y,:,0] = r; arr[y,:,1] = g; arr[y,:,2] = b
-    return Image.fromarray(arr)
-
 def draw_shadowed_rounded(draw, xy, radius, fill, outline=None, width=2):
     x, y, w, h = xy
     draw.rounded_rectangle([x+3, y+4, x+w+3, y+h+4], radius=radius, fill=SHADOW)
@@ -89,33 +79,11 @@ def draw_box(draw, xy, title, outline=OUTLINE, fill=PANEL, accent=None):
 
 def draw_arrow(draw, x1, y1, x2, y2, color, pulse=1.0):
     c = tuple(int(color[i]*pulse) for i in range(3))
-    draw.line([(x1, y1), (x2, y2)], fill=c, width=5)
-    angle = math.atan2(y2-y1, x2-x1)
-    L = 14
-    p1 = (x2, y2)
-    p2 = (x2 - L*math.cos(angle - 0.4), y2 - L*math.sin(angle - 0.4))
-    p3 = (x2 - L*math.cos(angle + 0.4), y2 - L*math.sin(angle + 0.4))
-    draw.polygon([p1, p2, p3], fill=c)
+    straight_arrow(draw, (x1, y1), (x2, y2), c, width=5, head=14)
 
 def draw_curve_arrow(draw, p0, p1, p2, color, width=7):
     """Quadratic Bézier from p0→p2 with control p1."""
-    pts = []
-    steps = 50
-    for i in range(steps+1):
-        t = i/steps
-        x = (1-t)**2*p0[0] + 2*(1-t)*t*p1[0] + t**2*p2[0]
-        y = (1-t)**2*p0[1] + 2*(1-t)*t*p1[1] + t**2*p2[1]
-        pts.append((x, y))
-    for i in range(len(pts)-1):
-        draw.line([pts[i], pts[i+1]], fill=color, width=width)
-    # arrow head
-    x2, y2 = pts[-1]; x1, y1 = pts[-2]
-    angle = math.atan2(y2-y1, x2-x1)
-    L = 16
-    pA = (x2, y2)
-    pB = (x2 - L*math.cos(angle - 0.4), y2 - L*math.sin(angle - 0.4))
-    pC = (x2 - L*math.cos(angle + 0.4), y2 - L*math.sin(angle + 0.4))
-    draw.polygon([pA, pB, pC], fill=color)
+    curve_arrow(draw, p0, p1, p2, color, width=width, head=16, steps=50)
 
 def lerp(a, b, t):
     return a + (b - a) * t
@@ -180,19 +148,8 @@ def scenario_state(name, t_rel, dur):
         state["lag"]       = int(lerp(0, 800_000, prog))
     return state
 
-# ---- Frame builder ----
-def make_frame(time_s):
-    # Pick scene
-    for (t0, t1, s) in scene_cum:
-        if t0 <= time_s < t1:
-            name = s["name"]; t_rel = time_s - t0; dur = s["dur"]
-            break
-    else:
-        name = "Closing"; t_rel = 0; dur = 1
-
-    img = gradient_bg()
-    draw = ImageDraw.Draw(img)
-
+# ---- Static layer (painted once per scene) ----
+def draw_static(draw, name):
     # Title
     draw.text((40, 40), "Consumer Lag Is a Symptom — Not the Problem", fill=TEXT, font=FONT_TITLE)
     draw.text((40, 88), "Kafka → Consumers → Elasticsearch → Dashboards", fill=MUTED, font=FONT_SUB)
@@ -204,22 +161,9 @@ def make_frame(time_s):
     draw_box(draw, layout["es"],        "Elasticsearch", accent=AMBER)
     draw_box(draw, layout["dash"],      "Dashboards",    accent=CYAN)
 
-    # Arrows pulse
-    def pulse(t): return 0.8 + 0.2*math.sin(2*math.pi*t)
-    p = pulse(time_s)
-
-    xS, yS, wS, hS = layout["source"]
-    xK, yK, wK, hK = layout["kafka"]
-    xC, yC, wC, hC = layout["consumers"]
+    # ---- ES → Dashboards curved link (use LINK for highlight, or OUTLINE for uniform) ----
     xE, yE, wE, hE = layout["es"]
     xD, yD, wD, hD = layout["dash"]
-
-    # Straight arrows
-    draw_arrow(draw, xS+wS, yS+hS//2, xK, yK+hK//2, OUTLINE, p)
-    draw_arrow(draw, xK+wK, yK+hK//2, xC, yC+hC//2, OUTLINE, p)
-    draw_arrow(draw, xC+wC, yC+hC//2, xE, yE+hE//2, OUTLINE, p)
-
-    # ---- ES → Dashboards curved link (use LINK for highlight, or OUTLINE for uniform) ----
     p0   = (xE + wE//2, yE + hE + 8)                 # bottom-center just below ES
     p2   = (xD + wD//2, yD - 8)                      # top-center just above Dashboards
     ctrl = (max(xE, xD) + abs(xD - xE)//2 + 80, (p0[1] + p2[1])//2)   # smooth arc to the right
@@ -227,13 +171,55 @@ def make_frame(time_s):
     # If you want uniform color across links:
     # draw_curve_arrow(draw, p0, ctrl, p2, color=OUTLINE, width=7)
 
-    # Scene text & metrics
     if name in ("Title", "Closing"):
         msg = ("Lag is your most honest signal. Find the bottleneck; don’t just add consumers."
                if name=="Title" else
                "Junior react to lag. Senior investigate lag.")
         draw.text((40, 130), msg, fill=TEXT, font=FONT_SUB)
     else:
+        # Status ribbon (fixed for the whole scene)
+        sev, msg = scenario_state(name, 0.0, 1.0)["status"]
+        color = TEAL if sev=="STEADY" else (WARN if sev=="WARN" else ERR)
+        draw.text((40, 180), f"Scene: {name}", fill=TEXT, font=FONT_SUB)
+        draw.text((40, 204), f"Status: {sev} — {msg}", fill=color, font=FONT_SUB)
+        draw.text((40, 232), "Lag shows WHERE the pain is, not WHAT to fix.", fill=MUTED, font=FONT_SMALL)
+
+    # Credits
+    credit_txt = "Credits: Chaitanya Pothuraju"
+    bbox = draw.textbbox((0,0), credit_txt, font=FONT_CREDIT)
+    tw = bbox[2] - bbox[0]; th = bbox[3] - bbox[1]
+    draw.text((W - tw - 20, H - th - 16), credit_txt, fill=MUTED, font=FONT_CREDIT)
+
+CANVAS = LayeredCanvas(lambda: layer((W, H), (BG_TOP, BG_BOTTOM), mode="RGBA"))
+
+# ---- Frame builder ----
+def scene_at(time_s):
+    s, t_rel, _ = TIMELINE.at(time_s)
+    return s["name"], t_rel, s["dur"]
+
+# Arrows pulse
+def pulse(t): return 0.8 + 0.2*math.sin(2*math.pi*t)
+
+def frame_image(time_s):
+    name, t_rel, dur = scene_at(time_s)
+
+    # Only the dynamic layer is drawn here; dirty rects are restored from the static one
+    draw = CANVAS.begin(name, lambda d: draw_static(d, name))
+
+    p = pulse(time_s)
+
+    xS, yS, wS, hS = layout["source"]
+    xK, yK, wK, hK = layout["kafka"]
+    xC, yC, wC, hC = layout["consumers"]
+    xE, yE, wE, hE = layout["es"]
+
+    # Straight arrows
+    draw_arrow(draw, xS+wS, yS+hS//2, xK, yK+hK//2, OUTLINE, p)
+    draw_arrow(draw, xK+wK, yK+hK//2, xC, yC+hC//2, OUTLINE, p)
+    draw_arrow(draw, xC+wC, yC+hC//2, xE, yE+hE//2, OUTLINE, p)
+
+    # Scene metrics
+    if name not in ("Title", "Closing"):
         state = scenario_state(name, t_rel, dur)
 
         # Source badge
@@ -297,34 +283,54 @@ def make_frame(time_s):
         # Lag text (Kafka bottom-right)
         draw.text((kx+kw-210, ky+kh-28), f"Total lag: {state['lag']:,}", fill=MUTED, font=FONT_SMALL)
 
-        # Status ribbon
-        sev, msg = state["status"]
-        color = TEAL if sev=="STEADY" else (WARN if sev=="WARN" else ERR)
-        draw.text((40, 180), f"Scene: {name}", fill=TEXT, font=FONT_SUB)
-        draw.text((40, 204), f"Status: {sev} — {msg}", fill=color, font=FONT_SUB)
-        draw.text((40, 232), "Lag shows WHERE the pain is, not WHAT to fix.", fill=MUTED, font=FONT_SMALL)
+    return CANVAS.image
 
-    # Credits
-    credit_txt = "Credits: Chaitanya Pothuraju"
-    bbox = draw.textbbox((0,0), credit_txt, font=FONT_CREDIT)
-    tw = bbox[2] - bbox[0]; th = bbox[3] - bbox[1]
-    draw.text((W - tw - 20, H - th - 16), credit_txt, fill=MUTED, font=FONT_CREDIT)
+def make_frame(time_s):
+    return np.array(frame_image(time_s).convert("RGB"))
 
-    return np.array(img)
+def frame_key(i):
+    # A frame is fully determined by its scene, the arrows' pulsed colour and the metrics
+    time_s = i / FPS
+    name, t_rel, dur = scene_at(time_s)
+    p = pulse(time_s)
+    arrow = tuple(int(OUTLINE[k]*p) for k in range(3))
+    if name in ("Title", "Closing"):
+        return name, arrow
+    return name, arrow, repr(scenario_state(name, t_rel, dur))
+
+def frame_state(i):
+    # What scenario_state contributes to frame i; the segment cache hashes this instead of its source
+    name, t_rel, dur = scene_at(i / FPS)
+    return None if name in ("Title", "Closing") else scenario_state(name, t_rel, dur)
 
 # ---- Render ----
-mp4_written = False
-try:
-    writer = imageio.get_writer('draft_consumer-lag-architecture-v3.mp4', fps=FPS, codec='libx264', quality=8)
-    for i in range(TOTAL_FRAMES):
-        t = i / FPS
-        frame = make_frame(t)
-        writer.append_data(frame)
-    writer.close()
-    mp4_written = True
-except Exception as e:
-    # Fallback GIF
-    imageio.mimsave('draft_consumer-lag-architecture-v3.gif',
-                    [make_frame(i/FPS) for i in range(TOTAL_FRAMES)], fps=12)
-
-print('Created:', 'MP4' if mp4_written else 'GIF')
+# Square and vertical cuts (VIDEOKIT_ASPECTS): title and status, the pipeline, credits; 9:16
+# stacks the pipeline as Source and Kafka, Consumers, Elasticsearch and Dashboards
+HEADER, CREDITS = (20, 20, 1040, 265), (990, 675, 1280, 715)
+REGIONS = {
+    "9:16": [HEADER, (60, 285, 690, 440), (690, 285, 1050, 440), (1040, 285, 1280, 590), CREDITS],
+    "*": [HEADER, (60, 285, 1280, 590), CREDITS],
+}
+
+def render():
+    mp4_written = False
+    try:
+        # Each scene is encoded once per change of its inputs and cached next to this script
+        stats = RenderStats()
+        cache = SegmentCache(Path(__file__).resolve().parent / ".videokit-cache",
+                             code_fingerprint(__file__, globals(), exclude=("scenes", "scenario_state")))
+        segments = [(s["name"], start, stop, (s["name"],)) for s, start, stop in TIMELINE.runs()]
+        render_segments('draft_consumer-lag-architecture-v3.mp4', lambda i: frame_image(i / FPS), segments, (W, H), FPS, cache,
+                        state_fn=frame_state, key_fn=frame_key, crf=10, stats=stats, regions=REGIONS)
+        mp4_written = True
+        print(stats)
+    except Exception as e:
+        # Fallback GIF
+        write_gif('draft_consumer-lag-architecture-v3.gif', lambda i: frame_image(i / FPS), TOTAL_FRAMES, FPS,
+                  key_fn=frame_key)
+
+    print('Created:', 'MP4' if mp4_written else 'GIF')
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,5 @@
+"""Shared rendering helpers for the Content/ video scripts.
+
+Scripts live in per-topic folders, so they put Content/ on sys.path and
+import the modules they need, e.g. ``from videokit.backgrounds import canvas``.
+"""
@@ -0,0 +1,52 @@
+"""Arrow geometry: Bézier points and arrowheads, computed once per shape.
+
+An arrow's end and control points rarely change within a scene, so the
+curve is evaluated with NumPy on first use and memoised by its control
+points, and so is the arrowhead triangle. A curve is drawn as a single
+polyline instead of one draw.line() per segment. Pillow's joint="curve"
+is not used: it rounds each vertex in Python and costs more than the
+loop it would replace, while 50 short segments leave no visible corners.
+
+    curve_arrow(draw, p0, ctrl, p2, OUTLINE, width=7)
+    straight_arrow(draw, (x1, y1), (x2, y2), color, width=5, head=14)
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=512)
+def quad_bezier(p0, p1, p2, steps=50):
+    """steps + 1 points on the quadratic Bézier p0 -> p2 with control p1."""
+    t = (np.arange(steps + 1) / steps)[:, None]
+    pts = ((1 - t) ** 2 * np.asarray(p0, dtype=float)
+           + 2 * (1 - t) * t * np.asarray(p1, dtype=float)
+           + t ** 2 * np.asarray(p2, dtype=float))
+    return tuple(map(tuple, pts.tolist()))
+
+
+@lru_cache(maxsize=512)
+def arrowhead(tail, tip, length=16, spread=0.4):
+    """Triangle with its point on `tip`, aimed along tail -> tip."""
+    (x1, y1), (x2, y2) = tail, tip
+    angle = math.atan2(y2 - y1, x2 - x1)
+    return ((x2, y2),
+            (x2 - length * math.cos(angle - spread), y2 - length * math.sin(angle - spread)),
+            (x2 - length * math.cos(angle + spread), y2 - length * math.sin(angle + spread)))
+
+
+def curve_arrow(draw, p0, p1, p2, color, width=7, head=16, steps=50):
+    pts = quad_bezier(tuple(p0), tuple(p1), tuple(p2), steps)
+    draw.line(pts, fill=color, width=width)
+    draw.polygon(arrowhead(pts[-2], pts[-1], head), fill=color)
+
+
+def straight_arrow(draw, p0, p1, color, width=5, head=14):
+    p0, p1 = tuple(p0), tuple(p1)
+    draw.line([p0, p1], fill=color, width=width)
+    draw.polygon(arrowhead(p0, p1, head), fill=color)
+
+
+def geometry_stats():
+    return {"curves": quad_bezier.cache_info(), "heads": arrowhead.cache_info()}
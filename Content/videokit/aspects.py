@@ -0,0 +1,192 @@
+"""Square and vertical cuts encoded in the same pass as the 16:9 video.
+
+Set VIDEOKIT_ASPECTS to also write feed formats next to the normal output:
+
+    VIDEOKIT_ASPECTS=all                 1:1, 4:5 and 9:16
+    VIDEOKIT_ASPECTS="1:1,9:16"          just these
+
+Each frame is drawn once, at the script's own size, and piped once into a
+single ffmpeg process whose filter graph builds every cut from it and
+encodes them side by side, so the extra formats cost encoder time and no
+drawing. A cut is the script's regions restacked for its shape: each row
+of regions is scaled by one factor, centred, and rows go top to bottom
+over a blurred, cover-scaled copy of the frame. Scripts describe their
+regions in their own pixel coordinates, as a list of rows (a row is one
+(x0, y0, x1, y1) rect or a tuple of rects side by side), or as a dict
+from aspect name to such a list with "*" for the rest:
+
+    REGIONS = {
+        "9:16": [HEADER, LEFT_PANEL, RIGHT_PANEL, CREDITS],   # panels stacked
+        "*": [HEADER, (LEFT_PANEL, RIGHT_PANEL), CREDITS],
+    }
+
+A layout can also change during the video: give a list of (first frame,
+rows) pairs instead, each in effect until the next one starts,
+
+    REGIONS = {"9:16": [(0, STACKED), (OUTRO_START, [HEADER, BODY, CREDITS])], "*": ...}
+
+Segment renders cut each segment with the layout(s) of its own frames; a
+single stream switches between them with timeline-enabled overlays.
+
+Without regions a cut shows the whole frame. The 16:9 output is encoded
+exactly as it is without VIDEOKIT_ASPECTS and the others are written as
+``<name>.1x1.mp4`` and so on. Previews ignore the setting.
+"""
+import os
+from pathlib import Path
+
+from .encode import FFmpegWriter, output_args, raw_input_args
+
+MASTER = "16:9"
+ASPECTS = {"1:1": (1080, 1080), "4:5": (1080, 1350), "9:16": (1080, 1920)}
+MARGIN = 0.04  # of the cut's width, around the stack
+GAP = 0.02     # of the cut's height, between rows and between regions in a row
+
+
+def aspects_from_env():
+    """Extra cuts requested by VIDEOKIT_ASPECTS, in ASPECTS order ([] for none)."""
+    spec = os.environ.get("VIDEOKIT_ASPECTS", "").strip()
+    if spec.lower() in ("", "0", "off", "false", "no"):
+        return []
+    if spec.lower() in ("1", "on", "true", "yes", "all"):
+        return list(ASPECTS)
+    names = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = names - set(ASPECTS) - {MASTER}
+    if unknown:
+        raise SystemExit(f"VIDEOKIT_ASPECTS: unknown aspect {sorted(unknown)[0]!r} "
+                         f"(choose from {', '.join(ASPECTS)})")
+    return [name for name in ASPECTS if name in names]
+
+
+def aspect_path(path, name):
+    """Where cut `name` of `path` is written; the 16:9 one is `path` itself."""
+    if name == MASTER:
+        return path
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{name.replace(':', 'x')}{path.suffix}")
+
+
+def _timed(regions, name):
+    # [(first frame, rows)] for cut `name`; a plain list of rows holds from frame 0.
+    if isinstance(regions, dict):
+        regions = regions.get(name, regions.get("*"))
+    if regions and isinstance(regions[0][0], int) and isinstance(regions[0][1], list):
+        return list(regions)
+    return [(0, regions)]
+
+
+def _rows(regions, size):
+    # Normalize to rows of rects; no regions means the whole frame.
+    if not regions:
+        return [((0, 0) + tuple(size),)]
+    return [row if isinstance(row[0], (tuple, list)) else (row,) for row in regions]
+
+
+def layout(size, name, regions=None):
+    """[(src rect, (x, y), (w, h))] placing `regions` of a `size` frame on cut `name`.
+
+    For a layout that changes over time, this is the one in effect at frame 0.
+    """
+    cut_w, cut_h = ASPECTS[name]
+    rows = _rows(_timed(regions, name)[0][1], size)
+    margin, gap = MARGIN * cut_w, GAP * cut_h
+    widths = [sum(r[2] - r[0] for r in row) for row in rows]
+    heights = [max(r[3] - r[1] for r in row) for row in rows]
+    gaps = [gap * (len(row) - 1) for row in rows]
+    # One scale for every row keeps text sizes consistent; the widest row or the total height limits it.
+    scale = min((cut_w - 2 * margin - g) / w for w, g in zip(widths, gaps))
+    scale = min(scale, (cut_h - 2 * margin - gap * (len(rows) - 1)) / sum(heights))
+    y = (cut_h - scale * sum(heights) - gap * (len(rows) - 1)) / 2
+    placed = []
+    for row, w, h, g in zip(rows, widths, heights, gaps):
+        x = (cut_w - scale * w - g) / 2
+        for x0, y0, x1, y1 in row:
+            dw, dh = round(scale * (x1 - x0)), round(scale * (y1 - y0))
+            placed.append(((x0, y0, x1, y1), (round(x), round(y + (scale * h - dh) / 2)), (dw, dh)))
+            x += scale * (x1 - x0) + gap
+        y += scale * h + gap
+    return placed
+
+
+def layouts(size, name, regions=None, span=(0, None)):
+    """[(ranges, placed)]: each layout of cut `name` shown during frames span[0]..span[1]-1.
+
+    `placed` is as layout() returns it and `ranges` lists the (first, last)
+    frames it is shown for, counted from span[0], last None for the end. A
+    single layout comes back as [([(0, None)], placed)].
+    """
+    start, stop = span
+    timed = _timed(regions, name)
+    ends = [first for first, _ in timed[1:]] + [None]
+    shown = {}
+    for (first, rows), end in zip(timed, ends):
+        end = stop if end is None else end if stop is None else min(end, stop)
+        first = max(first, start)
+        if end is not None and end <= first:
+            continue
+        placed = layout(size, name, rows)
+        shown.setdefault(repr(placed), (placed, []))[1].append(
+            (first - start, None if end is None else end - 1 - start))
+    if len(shown) == 1:
+        return [([(0, None)], placed) for placed, _ in shown.values()]
+    return [(ranges, placed) for placed, ranges in shown.values()]
+
+
+def _enable(ranges):
+    if ranges == [(0, None)]:
+        return ""
+    terms = [f"gte(n,{first})" if last is None else f"between(n,{first},{last})" for first, last in ranges]
+    return f":enable='{'+'.join(terms)}'"
+
+
+def filter_graph(size, names, regions=None, span=(0, None)):
+    """(filter_complex, output labels) building every cut in `names` from input 0,
+    whose frames are frames span[0]..span[1]-1 of the video."""
+    chains, labels, n_streams = [], [], 0
+    for n, name in enumerate(names):
+        if name == MASTER:
+            labels.append(f"s{n_streams}")  # straight through, untouched
+            n_streams += 1
+            continue
+        cut_w, cut_h = ASPECTS[name]
+        # Blur at an eighth of the size: as soft, and a fraction of the work.
+        chains.append(f"[s{n_streams}]scale={cut_w // 8}:{cut_h // 8}:force_original_aspect_ratio=increase,"
+                      f"crop={cut_w // 8}:{cut_h // 8},boxblur=6:2,scale={cut_w}:{cut_h},setsar=1[a{n}_0]")
+        n_streams += 1
+        j = 0
+        for ranges, placed in layouts(size, name, regions, span):
+            for (x0, y0, x1, y1), (x, y), (w, h) in placed:
+                # Opaque, as in the 16:9 encode: frames may carry alpha the overlay would blend.
+                chains.append(f"[s{n_streams}]crop={x1 - x0}:{y1 - y0}:{x0}:{y0},scale={w}:{h},format=rgb24"
+                              f"[r{n}_{j}]")
+                chains.append(f"[a{n}_{j}][r{n}_{j}]overlay={x}:{y}{_enable(ranges)}[a{n}_{j + 1}]")
+                n_streams += 1
+                j += 1
+        labels.append(f"a{n}_{j}")
+    split = f"[0:v]split={n_streams}" + "".join(f"[s{k}]" for k in range(n_streams))
+    return ";".join([split] + chains), labels
+
+
+class AspectWriter(FFmpegWriter):
+    """One ffmpeg process writing `paths` ({aspect name: path}) from the same raw frames,
+    frames span[0]..span[1]-1 of the video."""
+
+    def __init__(self, paths, size, fps, regions=None, pix_fmt_in="rgba", codec="libx264", crf=None,
+                 extra_args=(), span=(0, None)):
+        names = list(paths)
+        graph, labels = filter_graph(size, names, regions, span)
+        args = raw_input_args(size, fps, pix_fmt_in) + ["-filter_complex", graph]
+        for name, label in zip(names, labels):
+            args += ["-map", f"[{label}]"] + output_args(paths[name], codec, crf, extra_args)
+        self.path = paths.get(MASTER, paths[names[0]])
+        self.paths = paths
+        self._start(args)
+
+
+def open_writer(path, size, fps, regions=None, crf=None):
+    """FFmpegWriter for `path`, or an AspectWriter adding the VIDEOKIT_ASPECTS cuts."""
+    names = aspects_from_env()
+    if not names:
+        return FFmpegWriter(path, size, fps, crf=crf)
+    paths = {name: aspect_path(path, name) for name in [MASTER] + names}
+    return AspectWriter(paths, size, fps, regions, crf=crf)
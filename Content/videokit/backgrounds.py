@@ -0,0 +1,76 @@
+"""Vectorized, memoized gradient backgrounds.
+
+Every gradient is built once per (size, stops, direction) as a NumPy
+broadcast and handed back as a read-only array. Frames start from a copy:
+
+    img = canvas((W, H), (BG_TOP, BG_BOTTOM))            # vertical
+    img = canvas((W, H), (C1, C2, C3), "diagonal", mode="RGBA")
+"""
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+DIRECTIONS = ("vertical", "horizontal", "diagonal")
+
+
+def _normalize_stops(stops):
+    # Accept bare colors (evenly spaced) or (position, color) pairs.
+    stops = tuple(stops)
+    if len(stops) < 2:
+        raise ValueError("a gradient needs at least two stops")
+    if isinstance(stops[0][1], (tuple, list)):
+        return tuple((float(p), tuple(c)) for p, c in stops)
+    n = len(stops) - 1
+    return tuple((i / n, tuple(c)) for i, c in enumerate(stops))
+
+
+def _ramp(t, stops):
+    """Map t in [0, 1] (any shape) to float RGB with a + (b - a) * u per segment."""
+    pos = np.array([p for p, _ in stops])
+    cols = np.array([c for _, c in stops], dtype=np.float64)
+    seg = np.clip(np.searchsorted(pos, t, side="right") - 1, 0, len(stops) - 2)
+    p0, p1 = pos[seg], pos[seg + 1]
+    u = (t - p0) / (p1 - p0)
+    a, b = cols[seg], cols[seg + 1]
+    return a + (b - a) * u[..., None]
+
+
+@lru_cache(maxsize=32)
+def _gradient(size, stops, direction):
+    w, h = size
+    if direction == "vertical":
+        ramp = _ramp(np.arange(h) / (h - 1), stops).astype(np.uint8)
+        arr = np.broadcast_to(ramp[:, None, :], (h, w, 3))
+    elif direction == "horizontal":
+        ramp = _ramp(np.arange(w) / (w - 1), stops).astype(np.uint8)
+        arr = np.broadcast_to(ramp[None, :, :], (h, w, 3))
+    elif direction == "diagonal":
+        t = (np.arange(w)[None, :] + np.arange(h)[:, None]) / (w + h)
+        arr = _ramp(t, stops).astype(np.uint8)
+    else:
+        raise ValueError(f"unknown direction {direction!r}, expected one of {DIRECTIONS}")
+    arr = np.ascontiguousarray(arr)
+    arr.flags.writeable = False
+    return arr
+
+
+def gradient(size, stops, direction="vertical"):
+    """Return the cached (H, W, 3) uint8 gradient. The array is read-only."""
+    return _gradient(tuple(size), _normalize_stops(stops), direction)
+
+
+@lru_cache(maxsize=32)
+def _layer(size, stops, direction, mode):
+    img = Image.fromarray(_gradient(size, stops, direction))
+    return img if mode == "RGB" else img.convert(mode)
+
+
+def layer(size, stops, direction="vertical", mode="RGB"):
+    """Return the cached gradient as a PIL image. Never draw on it; use canvas()."""
+    return _layer(tuple(size), _normalize_stops(stops), direction, mode)
+
+
+def canvas(size, stops, direction="vertical", mode="RGB"):
+    """Return a fresh, drawable copy of the cached gradient layer."""
+    return layer(size, stops, direction, mode).copy()
@@ -0,0 +1,237 @@
+"""Frame-render benchmarks for the video scripts, checked against a JSON baseline.
+
+    cd Content
+    python -m videokit.bench                   # measure every script, compare with the baseline
+    python -m videokit.bench dlq scaling-v2    # just these
+    python -m videokit.bench --save            # measure and write the baseline
+
+Each script is imported in its own subprocess, so its render() (which
+only runs under ``__main__``) never starts and peak RSS is per script.
+The frame function is picked up by name, ``draw_frame(i)`` or
+``frame_image(t)``, and the scenes from ``TIMELINE`` or ``timeline()``.
+After one warm-up frame, a run of ``--run`` consecutive frames is timed
+at each of ``--frames`` points spread evenly over each scene, and then
+the first frame of every scene is drawn again under tracemalloc. A run
+starts with an untimed draw of the frame before it and no frame is timed
+twice, so each draw costs what it does in a sequential render: redrawing
+a frame would find it unchanged in the LayeredCanvas or Slide and its
+new text already in the sprite cache, and time it too fast. Each timed
+frame stands for an equal share of its scene, so frames/sec and the
+percentiles weigh long scenes as a full render does.
+
+Recorded per script: frames/sec, p50/p99 frame time, median frame time
+per scene, peak RSS, and peak Python-heap allocation per frame (Pillow's
+pixel buffers live outside it). A script regresses when frames/sec falls,
+or p99, RSS or allocation rises, by more than ``--tolerance``; the exit
+status is then 1. Timings are only comparable on the machine that wrote
+the baseline, whose details are stored with it; on a shared VM they drift
+by a third between runs, hence the loose default tolerance.
+
+With ``--transport``, each script's first frame is also sent once through
+pickle and bytes copies and once through a shared-memory slot, and the
+bytes each way allocates are printed (see framepool.transport_report).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from .framepool import transport_report
+
+CONTENT = Path(__file__).resolve().parents[1]
+BASELINE = CONTENT / "benchmarks" / "baseline.json"
+
+SCRIPTS = {
+    "dlq": "DLQ/DLQ.py",
+    "consumer-lag": "consumer-lag-architecture/video-architecture.py",
+    "scaling-v1": "Scaling from 10K to 10M Events per day/Scaling_from_10K_to_10M_Events_Day_v1.py",
+    "scaling-v2": "Scaling from 10K to 10M Events per day/Scaling_from_10K_to_10M_Events_Day_v2.py",
+    "es-index-design": "Designing Elasticsearch Indexes for High Write Throughput/"
+                       "Designing_Elasticsearch_Indexes_for_High_Write_Throughput.py",
+    "oversharding": "Oversharding: The Elasticsearch Mistake Everyone Makes (Once)/"
+                    "Oversharding: The Elasticsearch Mistake Everyone Makes (Once).py",
+}
+
+# (metric, True if higher is better)
+CHECKS = (("fps", True), ("p99_ms", False), ("peak_rss_mb", False), ("alloc_kb_per_frame", False))
+
+
+def load_script(name):
+    path = CONTENT / SCRIPTS[name]
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('-', '_')}", path)
+    module = importlib.util.module_from_spec(spec)
+    cwd = os.getcwd()
+    os.chdir(path.parent)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    return module
+
+
+def _label(scene):
+    return scene["name"] if isinstance(scene, dict) else str(scene)
+
+
+def frame_source(module):
+    """(frame_fn(i), [(scene label, start, stop), ...]) for a loaded script."""
+    fps = module.FPS
+    if hasattr(module, "draw_frame"):
+        frame_fn = module.draw_frame
+    elif hasattr(module, "frame_image"):
+        frame_fn = lambda i: module.frame_image(i / fps)
+    else:
+        raise RuntimeError(f"{module.__name__}: no draw_frame or frame_image")
+    # Scripts that build their scenes lazily expose timeline() instead of TIMELINE.
+    timeline = module.TIMELINE if hasattr(module, "TIMELINE") else module.timeline()
+    return frame_fn, [(_label(scene), a, b) for scene, a, b in timeline.runs()]
+
+
+def _samples(start, stop, n):
+    return sorted({start + int((stop - start) * (k + 0.5) / n) for k in range(n)})
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_times(frame_fn, start, stop):
+    if start > 0:
+        frame_fn(start - 1)  # the predecessor a sequential render would have drawn
+    times = []
+    for i in range(start, stop):
+        t = time.perf_counter()
+        frame_fn(i)
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def _weighted_percentile(values, weights, q):
+    order = np.argsort(values)
+    cum = np.cumsum(weights[order])
+    return float(values[order][np.searchsorted(cum, q / 100 * cum[-1])])
+
+
+def measure(name, frames_per_scene, run=3):
+    frame_fn, runs = frame_source(load_script(name))
+    frame_fn(runs[0][1])  # warm-up: fonts, backgrounds, static layers
+    times, weights, scenes = [], [], {}
+    for label, start, stop in runs:
+        scene_times = []
+        for i in _samples(start, stop, frames_per_scene):
+            scene_times += _run_times(frame_fn, i, min(i + run, stop))
+        scenes[label] = round(1000 * float(np.median(scene_times)), 2)
+        times += scene_times
+        weights += [(stop - start) / len(scene_times)] * len(scene_times)
+    allocs = []
+    for _, start, _ in runs:
+        tracemalloc.start()
+        try:
+            frame_fn(start)
+            allocs.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    ms, weights = 1000 * np.array(times), np.array(weights)
+    return {
+        "frames": len(times),
+        "fps": round(1000 * float(weights.sum() / (weights * ms).sum()), 2),
+        "p50_ms": round(_weighted_percentile(ms, weights, 50), 2),
+        "p99_ms": round(_weighted_percentile(ms, weights, 99), 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "alloc_kb_per_frame": round(float(np.mean(allocs)) / 1024, 1),
+        "scenes_ms": scenes,
+    }
+
+
+def measure_in_subprocess(name, frames_per_scene, run=3):
+    proc = subprocess.run([sys.executable, "-m", "videokit.bench", "--child", name,
+                           "--frames", str(frames_per_scene), "--run", str(run)],
+                          cwd=CONTENT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name}: benchmark failed\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def host_info():
+    return {"platform": platform.platform(), "python": platform.python_version(),
+            "pillow": PIL.__version__, "cpus": os.cpu_count()}
+
+
+def compare(name, result, base, tolerance):
+    """Printable line for one script, and whether it regressed against `base`."""
+    line = (f"{name:16} {result['fps']:7.1f} fps  p50 {result['p50_ms']:6.1f} ms  "
+            f"p99 {result['p99_ms']:6.1f} ms  rss {result['peak_rss_mb']:6.1f} MB  "
+            f"alloc {result['alloc_kb_per_frame']:7.1f} KB/frame")
+    if base is None:
+        return line + "  (no baseline)", False
+    worse = []
+    for metric, higher_is_better in CHECKS:
+        old, new = base[metric], result[metric]
+        change = (new - old) / old if old else 0.0
+        if (-change if higher_is_better else change) > tolerance:
+            worse.append(f"{metric} {old} -> {new}")
+    return line + ("  REGRESSED: " + "; ".join(worse) if worse else "  ok"), bool(worse)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m videokit.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("scripts", nargs="*", metavar="script",
+                        help=f"any of: {', '.join(SCRIPTS)} (default: all)")
+    parser.add_argument("--frames", type=int, default=4, help="timed frames per scene (default 4)")
+    parser.add_argument("--run", type=int, default=3, help="consecutive frames timed per point (default 3)")
+    parser.add_argument("--tolerance", type=float, default=0.4,
+                        help="allowed relative change before a metric counts as a regression")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--transport", action="store_true",
+                        help="also compare frame transports (copies vs. shared slots) on each script's first frame")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scripts + [args.child] if name and name not in SCRIPTS]
+    if unknown:
+        parser.error(f"unknown script {unknown[0]!r}; choose from {', '.join(SCRIPTS)}")
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.frames, args.run)))
+        return 0
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if baseline and not args.save and baseline.get("host") != host_info():
+        print(f"note: baseline was recorded on {baseline.get('host')}; timings may not compare")
+    results, regressed = {}, False
+    for name in args.scripts or SCRIPTS:
+        results[name] = measure_in_subprocess(name, args.frames, args.run)
+        line, worse = compare(name, results[name], baseline.get("scripts", {}).get(name), args.tolerance)
+        regressed |= worse
+        print(line)
+    if args.transport:
+        for name in args.scripts or SCRIPTS:
+            frame_fn, runs = frame_source(load_script(name))
+            frame = frame_fn(runs[0][1])
+            if not isinstance(frame, Image.Image):
+                frame = Image.fromarray(frame)
+            print(f"{name:16} {transport_report(frame)}")
+    if args.save:
+        scripts = dict(baseline.get("scripts", {}), **results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"host": host_info(), "frames_per_scene": args.frames,
+                                             "run": args.run, "scripts": scripts}, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
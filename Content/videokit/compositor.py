@@ -0,0 +1,137 @@
+"""Static/dynamic layer split with dirty-rectangle redraw.
+
+A scene's static content (titles, panels, fixed arrows, credits) is painted
+once into a cached layer. Each frame then restores only the rectangles the
+previous frame's dynamic drawing touched and paints the new dynamic content:
+
+    CANVAS = LayeredCanvas(layer((W, H), (BG_TOP, BG_BOTTOM)))
+
+    def make_frame(t):
+        draw = CANVAS.begin(scene_name, lambda d: draw_static(d, scene_name))
+        ...dynamic drawing through `draw`...
+        return np.array(CANVAS.image)
+
+This is byte-identical to a full redraw as long as every static element is
+painted before (or does not overlap) the dynamic ones.
+"""
+import math
+
+from PIL import ImageDraw
+
+
+def _bounds(xy):
+    # Accept [x0, y0, x1, y1], [(x0, y0), (x1, y1), ...] or a flat coordinate list.
+    flat = []
+    for v in xy:
+        if isinstance(v, (tuple, list)):
+            flat.extend(v)
+        else:
+            flat.append(v)
+    xs, ys = flat[0::2], flat[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class TrackingDraw:
+    """ImageDraw proxy that records the bounding box of everything it paints.
+
+    Measurement calls (textbbox, textlength, ...) pass straight through.
+    """
+
+    def __init__(self, draw, dirty):
+        self._draw = draw
+        self._dirty = dirty
+
+    def __getattr__(self, name):
+        return getattr(self._draw, name)
+
+    def _mark(self, box, pad):
+        x0, y0, x1, y1 = box
+        self._dirty.append((math.floor(x0 - pad), math.floor(y0 - pad),
+                            math.ceil(x1 + pad) + 1, math.ceil(y1 + pad) + 1))
+
+    def _shape(self, method, xy, *args, **kwargs):
+        self._mark(_bounds(xy), kwargs.get("width", 1) + 1)
+        return getattr(self._draw, method)(xy, *args, **kwargs)
+
+    def rectangle(self, xy, *args, **kwargs):
+        return self._shape("rectangle", xy, *args, **kwargs)
+
+    def rounded_rectangle(self, xy, *args, **kwargs):
+        return self._shape("rounded_rectangle", xy, *args, **kwargs)
+
+    def ellipse(self, xy, *args, **kwargs):
+        return self._shape("ellipse", xy, *args, **kwargs)
+
+    def arc(self, xy, *args, **kwargs):
+        return self._shape("arc", xy, *args, **kwargs)
+
+    def pieslice(self, xy, *args, **kwargs):
+        return self._shape("pieslice", xy, *args, **kwargs)
+
+    def line(self, xy, *args, **kwargs):
+        return self._shape("line", xy, *args, **kwargs)
+
+    def polygon(self, xy, *args, **kwargs):
+        return self._shape("polygon", xy, *args, **kwargs)
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        opts = {k: v for k, v in kwargs.items() if k not in ("stroke_fill",)}
+        self._mark(self._draw.textbbox(xy, text, font=font, **opts), 1)
+        return self._draw.text(xy, text, fill, font, *args, **kwargs)
+
+    def bitmap(self, xy, bitmap, fill=None):
+        x, y = xy
+        self._mark((x, y, x + bitmap.width, y + bitmap.height), 1)
+        return self._draw.bitmap(xy, bitmap, fill=fill)
+
+
+class LayeredCanvas:
+    """Per-scene static layers plus a working image repainted by dirty rectangle.
+
+    `base` is the background image, or a function returning it that is
+    called on first use, so a module-level canvas costs nothing to import.
+    `keep` bounds how many static layers stay cached (oldest dropped
+    first); scenes are rendered one after another, so a couple is enough
+    to save a full-frame copy per scene.
+    """
+
+    def __init__(self, base, draw_mode=None, keep=None):
+        self._base = base
+        self._draw_mode = draw_mode
+        self._keep = keep
+        self._static = {}
+        self._key = None
+        self._dirty = []
+        self._draw = None
+        self.image = None
+
+    def _new_draw(self, img):
+        return ImageDraw.Draw(img, self._draw_mode)
+
+    def static_layer(self, key, paint_static):
+        static = self._static.get(key)
+        if static is None:
+            if callable(self._base):
+                self._base = self._base()
+            static = self._base.copy()
+            paint_static(self._new_draw(static))
+            self._static[key] = static
+            if self._keep is not None and len(self._static) > self._keep:
+                del self._static[next(iter(self._static))]
+        return static
+
+    def begin(self, key, paint_static):
+        """Start a frame of scene `key`; returns a draw for the dynamic layer."""
+        static = self.static_layer(key, paint_static)
+        if key != self._key or self.image is None:
+            self.image = static.copy()
+            self._draw = self._new_draw(self.image)
+            self._key = key
+        else:
+            w, h = self.image.size
+            for x0, y0, x1, y1 in self._dirty:
+                box = (max(0, x0), max(0, y0), min(w, x1), min(h, y1))
+                if box[0] < box[2] and box[1] < box[3]:
+                    self.image.paste(static.crop(box), box[:2])
+        self._dirty = []
+        return TrackingDraw(self._draw, self._dirty)
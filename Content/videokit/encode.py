@@ -0,0 +1,99 @@
+"""Raw-frame ffmpeg encoder fed through stdin, and stream-copy concat."""
+import os
+import shutil
+
+
+def ffmpeg_exe():
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        raise RuntimeError("ffmpeg is not available here.")
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def raw_input_args(size, fps, pix_fmt_in="rgba"):
+    """ffmpeg arguments reading raw `size` frames from stdin."""
+    w, h = size
+    return [
+        "-f", "rawvideo",
+        "-vcodec", "rawvideo",
+        "-pix_fmt", pix_fmt_in,
+        "-s", f"{w}x{h}",
+        "-r", str(fps),
+        "-i", "-",
+    ]
+
+
+def output_args(path, codec="libx264", crf=None, extra_args=()):
+    """ffmpeg arguments for one H.264 output file."""
+    args = ["-an", "-c:v", codec, "-pix_fmt", "yuv420p"]
+    if crf is not None:
+        args += ["-crf", str(crf)]
+    return args + list(extra_args) + ["-movflags", "+faststart", str(path)]
+
+
+class FFmpegWriter:
+    """Pipe raw frames (rgba by default) into an H.264 encode.
+
+    ``crf=10`` matches what imageio's ``quality=8`` passes to libx264.
+    """
+
+    def __init__(self, path, size, fps, pix_fmt_in="rgba", codec="libx264", crf=None, extra_args=()):
+        self.path = path
+        self._start(raw_input_args(size, fps, pix_fmt_in) + output_args(path, codec, crf, extra_args))
+
+    def _start(self, args):
+        import subprocess
+
+        cmd = [ffmpeg_exe(), "-y", "-loglevel", "error"] + args
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, buf):
+        self._proc.stdin.write(buf)
+
+    def close(self):
+        self._proc.stdin.close()
+        ret = self._proc.wait()
+        stderr = self._proc.stderr.read().decode("utf-8", errors="ignore")
+        if ret != 0:
+            raise RuntimeError(stderr[-2000:])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._proc.kill()
+            self._proc.wait()
+
+
+def concat(parts, out_path):
+    """Join encoded segments with the concat demuxer, without re-encoding.
+
+    All parts must share codec, size, frame rate and pixel format, as
+    FFmpegWriter segments with the same settings do.
+    """
+    import subprocess
+    import tempfile
+
+    fd, list_path = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for part in parts:
+                escaped = os.path.abspath(part).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        cmd = [
+            ffmpeg_exe(), "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-movflags", "+faststart", str(out_path),
+        ]
+        proc = subprocess.run(cmd, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode("utf-8", errors="ignore")[-2000:])
+    finally:
+        os.remove(list_path)
@@ -0,0 +1,115 @@
+"""Font lookup and FreeType faces shared by the video scripts.
+
+    FONT_TITLE = load(("DejaVuSans-Bold.ttf", "/System/Library/Fonts/Helvetica.ttc"), 31)
+
+find() returns the first candidate that exists. A bare file name is looked
+up in the system font directories, as ImageFont.truetype() does, and the
+path found is remembered in a JSON file (VIDEOKIT_FONT_CACHE, default
+~/.cache/videokit/fonts.json) so later runs skip the directory walk; a
+remembered path costs one stat to re-check. Candidates with a directory
+part are only checked where they are.
+
+face() memoises FreeType faces by (path, size, index), so every helper
+asking for the same font gets the same object and the sprite and text
+layout caches, which are keyed by font, are shared between them. Faces
+are loaded in the parent (at import or by the frame drawn before the
+fork) and forked render workers inherit them.
+"""
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageFont
+
+_FOUND = None  # bare name -> path, as stored in the cache file
+
+
+def cache_file():
+    env = os.environ.get("VIDEOKIT_FONT_CACHE")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(base) / "videokit" / "fonts.json"
+
+
+def font_dirs():
+    """The directories ImageFont.truetype() searches on this platform."""
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR")
+        return [os.path.join(windir, "fonts")] if windir else []
+    if sys.platform == "darwin":
+        return ["/Library/Fonts", "/System/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    return [os.path.join(d, "fonts") for d in [data_home] + data_dirs.split(":")]
+
+
+@lru_cache(maxsize=1)
+def _installed():
+    # One walk of the font directories per process, first match wins.
+    files = {}
+    for directory in font_dirs():
+        for root, _, names in os.walk(directory):
+            for name in names:
+                files.setdefault(name, os.path.join(root, name))
+    return files
+
+
+def _found():
+    global _FOUND
+    if _FOUND is None:
+        try:
+            _FOUND = dict(json.loads(cache_file().read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            _FOUND = {}
+    return _FOUND
+
+
+def _save(found):
+    path = cache_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(found, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a read-only home only costs the walk next time
+
+
+def _locate(name):
+    name = os.fspath(name)
+    if os.path.dirname(name) or os.path.exists(name):
+        return name if os.path.exists(name) else None
+    found = _found()
+    path = found.get(name)
+    if path and os.path.exists(path):
+        return path
+    path = _installed().get(name)
+    if path:
+        found[name] = path
+        _save(found)
+    return path
+
+
+def find(*candidates):
+    """Path of the first candidate font that exists, or None."""
+    for name in candidates:
+        path = _locate(name)
+        if path:
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def face(path, size, index=0):
+    return ImageFont.truetype(path, size=size, index=index)
+
+
+def load(candidates, size, index=0):
+    """face() of the first candidate found, or Pillow's default font."""
+    if isinstance(candidates, (str, os.PathLike)):
+        candidates = (candidates,)
+    path = find(*candidates)
+    return face(path, size, index) if path else ImageFont.load_default()
@@ -0,0 +1,109 @@
+"""Streaming GIF export for the scripts' fallback when ffmpeg is missing.
+
+    write_gif("out.gif", lambda i: frame_image(i / FPS), TOTAL_FRAMES, FPS)
+
+Only the source frames that land on the 12 fps GIF timeline are rendered.
+They are quantized in the render workers against one palette built from a
+few sampled frames, and each is appended to the file as soon as it arrives,
+so memory use stays flat however long the video is. Frame delays are
+whole centiseconds, alternated so the GIF keeps the video's running time,
+and frames held by ``key_fn`` are written once with a longer delay.
+"""
+from PIL import Image
+
+from .runner import render_frames
+
+GIF_FPS = 12
+_PALETTE = None
+
+
+def gif_frames(n_frames, fps, gif_fps=GIF_FPS):
+    """Source frame index of each GIF frame, dropping the ones in between."""
+    gif_fps = min(gif_fps, fps)
+    n_out = max(1, round(n_frames * gif_fps / fps))
+    return [min(n_frames - 1, int(k * fps / gif_fps)) for k in range(n_out)]
+
+
+def gif_delays(n_out, gif_fps=GIF_FPS):
+    """Per-frame delays in ms, on the centisecond grid GIF stores them in."""
+    cs = [round(k * 100 / gif_fps) for k in range(n_out + 1)]
+    return [10 * (b - a) for a, b in zip(cs, cs[1:])]
+
+
+def _rgb(frame):
+    if not isinstance(frame, Image.Image):
+        frame = Image.fromarray(frame)
+    return frame.convert("RGB")
+
+
+def shared_palette(frames, colors=256):
+    """A "P" image whose palette covers all of `frames`, tiled at half size."""
+    tiles = [_rgb(f).reduce(2) for f in frames]
+    w, h = tiles[0].size
+    sheet = Image.new("RGB", (w, h * len(tiles)))
+    for k, tile in enumerate(tiles):
+        sheet.paste(tile, (0, k * h))
+    return sheet.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+
+
+def _quantized(frame_fn):
+    return lambda i: _rgb(frame_fn(i)).quantize(palette=_PALETTE)
+
+
+class GifWriter:
+    """Append palette images to a looping GIF as they are produced."""
+
+    def __init__(self, path, loop=0):
+        self.path = path
+        self.loop = loop
+        self._file = open(path, "wb")
+        self._started = False
+
+    def write(self, im, duration):
+        from PIL import GifImagePlugin  # pulls in subprocess; only a GIF export needs it
+
+        if not self._started:
+            # optimize=False keeps the shared palette intact for every later frame.
+            header, _ = GifImagePlugin.getheader(im, info={"loop": self.loop, "optimize": False})
+            self._file.writelines(header)
+            self._started = True
+        self._file.writelines(GifImagePlugin.getdata(im, duration=duration))
+
+    def close(self):
+        self._file.write(b";")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def write_gif(path, frame_fn, n_frames, fps, gif_fps=GIF_FPS, samples=8, key_fn=None,
+              workers=None, stats=None):
+    """Render `frame_fn(i)` (an image or array) at `gif_fps` into the GIF at `path`."""
+    global _PALETTE
+    picks = gif_frames(n_frames, fps, gif_fps)
+    delays = gif_delays(len(picks), min(gif_fps, fps))
+    sampled = picks[:: max(1, len(picks) // samples)][:samples]
+    # Converted as drawn: a frame function may hand back a canvas it redraws on the next call.
+    _PALETTE = shared_palette([_rgb(frame_fn(i)) for i in sampled])
+    sel_key_fn = None if key_fn is None else (lambda k: key_fn(picks[k]))
+    try:
+        with GifWriter(path) as writer:
+            held, held_ms = None, 0
+            for k, im in enumerate(render_frames(_quantized(lambda k: frame_fn(picks[k])), len(picks),
+                                                 workers=workers, key_fn=sel_key_fn, stats=stats)):
+                if im is not held:
+                    if held is not None:
+                        writer.write(held, held_ms)
+                    held, held_ms = im, 0
+                held_ms += delays[k]
+            writer.write(held, held_ms)
+    finally:
+        _PALETTE = None
+    return path
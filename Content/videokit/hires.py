@@ -0,0 +1,82 @@
+"""Redraw a frame at a multiple of its size, from its own coordinates.
+
+    img = canvas((2 * W, 2 * H), (BG_TOP, BG_BOTTOM), mode="RGBA")
+    draw = ScaledDraw(ImageDraw.Draw(img), 2)
+    draw_box(draw, (80, 300, 220, 90), "Kafka Topic", FONT_SUB)   # W x H coordinates
+
+ScaledDraw takes the ImageDraw calls a frame function makes and makes
+them on an image `scale` times larger: points, boxes, radii and line
+widths are multiplied, and text is drawn with the same face at `scale`
+times the size. Text is measured at the original size (textbbox,
+textlength), so layout code that centres or wraps by measurement places
+things where the 1x frame has them. The result is a true re-render, not
+an upscale: edges and glyphs are rasterized at the larger size, though
+hinting can move a glyph by a pixel against a plain 2x enlargement.
+
+Only the primitives listed here are scaled; anything else raises rather
+than drawing at the wrong size.
+"""
+from PIL import ImageFont
+
+from .fonts import face
+
+
+def _scaled_font(font, scale):
+    if isinstance(font, ImageFont.FreeTypeFont):
+        return face(font.path, round(font.size * scale), getattr(font, "index", 0))
+    return font
+
+
+class ScaledDraw:
+    def __init__(self, draw, scale):
+        self.draw = draw
+        self.scale = scale
+
+    def _n(self, v):
+        return v * self.scale
+
+    def _xy(self, xy):
+        # Boxes and point lists come flat ([x0, y0, x1, y1], [x, y, ...]) or as pairs.
+        s = self.scale
+        if xy and isinstance(xy[0], (tuple, list)):
+            return [(x * s, y * s) for x, y in xy]
+        return [v * s for v in xy]
+
+    def _width(self, width):
+        # A hairline stays visible: at least one pixel per original pixel.
+        return max(1, round(width * self.scale)) if width else width
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.draw.rectangle(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1, **kwargs):
+        self.draw.rounded_rectangle(self._xy(xy), radius=self._n(radius), fill=fill, outline=outline,
+                                    width=self._width(width), **kwargs)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self.draw.ellipse(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        xy = self._xy(xy)
+        width = self._width(width)
+        self.draw.line(xy, fill=fill, width=width, joint=joint)
+        if joint is None and width > 2:
+            # A 1x polyline's short segments hide their joins; at scale x the width Pillow leaves
+            # notches between them (joint="curve" too), so fill each inner vertex with a disc.
+            pts = xy if isinstance(xy[0], tuple) else list(zip(xy[0::2], xy[1::2]))
+            r = width / 2
+            for x, y in pts[1:-1]:
+                self.draw.ellipse((x - r, y - r, x + r, y + r), fill=fill)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self.draw.polygon(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def text(self, xy, text, fill=None, font=None, spacing=4, stroke_width=0, **kwargs):
+        self.draw.text(self._xy(xy), text, fill=fill, font=_scaled_font(font, self.scale),
+                       spacing=self._n(spacing), stroke_width=self._width(stroke_width), **kwargs)
+
+    def textbbox(self, xy, text, font=None, **kwargs):
+        return self.draw.textbbox(xy, text, font=font, **kwargs)
+
+    def textlength(self, text, font=None, **kwargs):
+        return self.draw.textlength(text, font=font, **kwargs)
@@ -0,0 +1,106 @@
+"""Render straight into an encoder with drawing and pipe writes overlapped.
+
+    with FFmpegWriter(path, (W, H), FPS) as writer:
+        encode_frames(writer, draw_frame, TOTAL_FRAMES, (W, H), key_fn=frame_key, stats=stats)
+
+A frame passes three stages: draw (the frame function), copy (pasting it
+into a shared RGBA slot) and write (handing the slot to ffmpeg's stdin).
+With render workers, draw and copy run in the forked workers and this
+process only writes. With a single worker the stages would otherwise take
+turns, so writes move to a thread fed through a bounded queue of slots;
+a pipe write blocks outside the GIL while ffmpeg catches up, and the next
+frame is drawn meanwhile. The queue is shortened to fit the shared-memory
+budget (see videokit.framepool); with no room at all, frames are written
+as bytes on this thread.
+
+Each stage's busy time goes into the RenderStats, which prints it as
+utilization: a stage near 100% is the bottleneck.
+"""
+import queue
+import threading
+import time
+
+from .framepool import FramePool, frame_slots
+from .runner import RenderStats, _parallel, default_workers, hold_plan, render_shared
+
+
+def _write_thread(writer, pool, ready, free, stats, failure):
+    while True:
+        item = ready.get()
+        if item is None:
+            return
+        slot, n = item
+        if not failure:
+            t = time.perf_counter()
+            try:
+                with pool.view(slot) as view:
+                    for _ in range(n):
+                        writer.write(view)
+            except BaseException as exc:  # surfaced on the drawing thread
+                failure.append(exc)
+            stats.add_busy("write", time.perf_counter() - t)
+        free.put(slot)
+
+
+def _encode_bytes(writer, frame_fn, leaders, repeats, stats):
+    for i, n in zip(leaders, repeats):
+        t0 = time.perf_counter()
+        buf = memoryview(frame_fn(i).convert("RGBA").tobytes())
+        t1 = time.perf_counter()
+        for _ in range(n):
+            writer.write(buf)
+        stats.add_busy("draw", t1 - t0)
+        stats.add_busy("write", time.perf_counter() - t1)
+
+
+def _encode_threaded(writer, frame_fn, leaders, repeats, size, depth, stats):
+    slots = min(depth + 2, frame_slots(size))
+    if slots < 1:
+        return _encode_bytes(writer, frame_fn, leaders, repeats, stats)
+    ready, free, failure = queue.Queue(depth), queue.Queue(), []
+    with FramePool(size, slots) as pool:
+        for slot in range(pool.slots):
+            free.put(slot)
+        thread = threading.Thread(target=_write_thread, args=(writer, pool, ready, free, stats, failure),
+                                  daemon=True)
+        thread.start()
+        try:
+            for i, n in zip(leaders, repeats):
+                t0 = time.perf_counter()
+                frame = frame_fn(i)
+                t1 = time.perf_counter()
+                slot = free.get()
+                if failure:
+                    raise failure[0]
+                t2 = time.perf_counter()
+                pool.write(slot, frame)
+                stats.add_busy("draw", t1 - t0)
+                stats.add_busy("copy", time.perf_counter() - t2)
+                ready.put((slot, n))
+        finally:
+            ready.put(None)
+            thread.join()
+        if failure:
+            raise failure[0]
+
+
+def encode_frames(writer, frame_fn, n_frames, size, workers=None, key_fn=None, stats=None, depth=4):
+    """Write every frame of `frame_fn` (RGBA images of `size`) to `writer` in order."""
+    workers = default_workers() if workers is None else workers
+    own = stats if stats is not None else RenderStats()
+    start = time.perf_counter()
+    if _parallel(workers):
+        for view in render_shared(frame_fn, n_frames, size, workers=workers, key_fn=key_fn, stats=own):
+            t = time.perf_counter()
+            writer.write(view)
+            own.add_busy("write", time.perf_counter() - t)
+        lanes = {"draw": workers, "copy": workers, "write": 1}
+    else:
+        leaders, repeats = hold_plan(n_frames, key_fn)
+        own.frames, own.rendered = n_frames, len(leaders)
+        _encode_threaded(writer, frame_fn, leaders, repeats, size, depth, own)
+        lanes = {"draw": 1, "copy": 1, "write": 1}
+    wall = time.perf_counter() - start
+    for stage, n in lanes.items():
+        own.add_capacity(stage, wall * n)
+    return own
@@ -0,0 +1,110 @@
+"""Preview renders: a subset of the frames, downscaled, with a fast encode.
+
+Set VIDEOKIT_PREVIEW to render a quick look instead of the real video:
+
+    VIDEOKIT_PREVIEW=1                                   quarter size, ~5 fps, whole video
+    VIDEOKIT_PREVIEW="scene=hot partition"               one scene only
+    VIDEOKIT_PREVIEW="scale=0.5,step=2,frames=300:600"   every 2nd frame of 300..599
+
+Keys are scale (output size factor), step (keep every step-th frame; the
+default is whatever lands nearest 5 fps), frames (start:stop in the
+script's own frame numbers), scene (a scene label, or part of one, which
+covers the first through the last matching scene) and preset (libx264).
+The output goes next to the real one with a ".preview" suffix and the
+segment cache is neither read nor written. A bad setting exits with a
+message instead of raising, so the scripts' GIF fallbacks cannot turn a
+typo into a full-length render.
+
+Frames are still drawn at full size by the unchanged frame code and only
+shrunk by ffmpeg, so a preview shows exactly the final layout. The time
+saved comes from drawing a fraction of the frames and encoding them small
+with a fast preset.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from .encode import FFmpegWriter
+from .pipeline import encode_frames
+
+PREVIEW_FPS = 5
+
+
+@dataclass(frozen=True)
+class Preview:
+    scale: float = 0.25
+    step: int = None
+    frames: tuple = None
+    scene: str = None
+    preset: str = "ultrafast"
+    crf: int = 28
+
+    @classmethod
+    def from_env(cls):
+        """The preview requested by VIDEOKIT_PREVIEW, or None for a full render."""
+        spec = os.environ.get("VIDEOKIT_PREVIEW", "").strip()
+        if spec.lower() in ("", "0", "off", "false", "no"):
+            return None
+        if spec.lower() in ("1", "on", "true", "yes"):
+            return cls()
+        opts = {}
+        for item in spec.split(","):
+            key, sep, value = item.partition("=")
+            key, value = key.strip(), value.strip()
+            if not sep or key not in ("scale", "step", "frames", "scene", "preset"):
+                raise SystemExit(f"VIDEOKIT_PREVIEW: cannot parse {item.strip()!r}")
+            try:
+                if key == "scale":
+                    opts[key] = float(value)
+                elif key == "step":
+                    opts[key] = max(1, int(value))
+                elif key == "frames":
+                    start, _, stop = value.partition(":")
+                    opts[key] = (int(start or 0), int(stop) if stop else None)
+                else:
+                    opts[key] = value
+            except ValueError:
+                raise SystemExit(f"VIDEOKIT_PREVIEW: bad {key} {value!r}")
+        return cls(**opts)
+
+    def step_for(self, fps):
+        return self.step or max(1, round(fps / PREVIEW_FPS))
+
+    def size_for(self, size):
+        # libx264 with yuv420p needs even dimensions.
+        return tuple(max(2, round(n * self.scale / 2) * 2) for n in size)
+
+    def select(self, n_frames, fps, runs=()):
+        """Frame numbers to render, given (label, start, stop) scene runs."""
+        start, stop = 0, n_frames
+        if self.frames is not None:
+            a, b = self.frames
+            start, stop = max(start, a), min(stop, n_frames if b is None else b)
+        if self.scene is not None:
+            spans = [(a, b) for label, a, b in runs if str(label) == self.scene]
+            if not spans:
+                wanted = self.scene.lower()
+                spans = [(a, b) for label, a, b in runs if wanted in str(label).lower()]
+            if not spans:
+                labels = ", ".join(str(label) for label, _, _ in runs)
+                raise SystemExit(f"VIDEOKIT_PREVIEW: no scene {self.scene!r} (scenes: {labels})")
+            start, stop = max(start, spans[0][0]), min(stop, spans[-1][1])
+        return range(start, stop, self.step_for(fps))
+
+    def out_path(self, path):
+        path = Path(path)
+        return path.with_name(f"{path.stem}.preview{path.suffix}")
+
+
+def render_preview(out_path, frame_fn, n_frames, size, fps, preview, runs=(), key_fn=None, stats=None):
+    """Render and encode `preview`'s selection of frames; returns the file written."""
+    frames = preview.select(n_frames, fps, runs)
+    if not frames:
+        raise SystemExit("VIDEOKIT_PREVIEW selects no frames")
+    w, h = preview.size_for(size)
+    path = preview.out_path(out_path)
+    extra = ["-preset", preview.preset, "-vf", f"scale={w}:{h}"]
+    sel_key_fn = None if key_fn is None else (lambda k: key_fn(frames[k]))
+    with FFmpegWriter(path, size, fps / preview.step_for(fps), crf=preview.crf, extra_args=extra) as writer:
+        encode_frames(writer, lambda k: frame_fn(frames[k]), len(frames), size, key_fn=sel_key_fn, stats=stats)
+    return path
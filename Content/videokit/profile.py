@@ -0,0 +1,271 @@
+"""Per-primitive draw profiles for the video scripts, as flame-graph input.
+
+    cd Content
+    python -m videokit.profile dlq                    # writes dlq.folded, prints the tables
+    python -m videokit.profile scaling-v2 --by-scene --encode -o /tmp/v2.folded
+
+The script is loaded like the benchmark loads it, then instrumented: every
+function it defines or imports from videokit (round_rect, draw_box,
+draw_arrow, center_text, blit_text, canvas, ...), the same for the modules
+it imports from its own folder (the Scaling videos' pipeline_video), the
+drawing helpers in videokit's own modules, the Pillow calls frames are made of
+(ImageDraw.rounded_rectangle, ImageDraw.textbbox, Image.convert, ...) and,
+with ``--encode``, FFmpegWriter.write are swapped for timing wrappers.
+``--frames`` frames spread over each scene are then drawn with the scene
+label as the root of the call stack. Nothing is wrapped outside a Profiler,
+so the scripts and normal renders pay nothing for this.
+
+Per call path the profiler records calls and total and self time. The
+folded output has one ``script;scene;draw_frame;draw_box;ImageDraw.text
+<self microseconds>`` line per path, which flamegraph.pl, speedscope and
+inferno read as-is. Profiles are taken in one thread and one process; the
+first frame of a scene also pays for the caches it fills.
+"""
+import argparse
+import functools
+import inspect
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .bench import SCRIPTS, _samples, frame_source, load_script
+from .encode import FFmpegWriter
+
+DRAWING_MODULES = ("arrows", "backgrounds", "compositor", "slides", "sprites", "textlayout")
+PILLOW = (
+    (ImageDraw.ImageDraw, "ImageDraw", ("arc", "bitmap", "ellipse", "line", "multiline_text", "pieslice",
+                                         "point", "polygon", "rectangle", "rounded_rectangle", "text",
+                                         "textbbox", "textlength")),
+    (Image.Image, "Image", ("alpha_composite", "convert", "copy", "crop", "filter", "paste", "putalpha",
+                            "resize", "rotate", "tobytes")),
+    (Image, "Image", ("alpha_composite", "fromarray", "new")),
+    (ImageFont, "ImageFont", ("truetype",)),
+)
+
+
+class Profiler:
+    """Times wrapped callables by call path. Use as a context manager so
+    every patched attribute is put back on exit."""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.total = defaultdict(float)
+        self.own = defaultdict(float)
+        self._stack = []  # [name, time spent in wrapped callees]
+        self._patched = []
+
+    def _enter(self, name):
+        self._stack.append([name, 0.0])
+        return time.perf_counter()
+
+    def _exit(self, start):
+        elapsed = time.perf_counter() - start
+        path = tuple(name for name, _ in self._stack)
+        _, inner = self._stack.pop()
+        self.calls[path] += 1
+        self.total[path] += elapsed
+        self.own[path] += elapsed - inner
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def wrap(self, name, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = self._enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(start)
+
+        for attr in ("cache_info", "cache_clear"):  # keep lru_cache reporting working
+            if hasattr(fn, attr):
+                setattr(timed, attr, getattr(fn, attr))
+        timed._profiled = True
+        return timed
+
+    def patch(self, owner, attr, name):
+        original = vars(owner)[attr]  # the plain function, not a bound method
+        if getattr(original, "_profiled", False):
+            return
+        self._patched.append((owner, attr, original))
+        setattr(owner, attr, self.wrap(name, original))
+
+    def instrument(self, namespace, prefix=None, local=()):
+        """Wrap the functions in a module's globals that it defines or takes
+        from videokit or from the `local` modules (by name). Calls resolve
+        globals at call time, so this reaches every caller in the module."""
+        module = namespace.get("__name__", "")
+        for attr, value in list(namespace.items()):
+            if not (inspect.isfunction(value) or hasattr(value, "cache_info")):
+                continue
+            owner = value.__module__ or ""
+            if owner == module:
+                name = f"{prefix}.{attr}" if prefix else attr
+            elif owner in local:
+                name = f"{owner}.{value.__name__}"
+            elif owner.startswith("videokit.") and owner != __name__:
+                name = f"{owner.rsplit('.', 1)[1]}.{value.__name__}"
+            else:
+                continue
+            self.patch_global(namespace, attr, name)
+
+    def patch_global(self, namespace, attr, name):
+        original = namespace[attr]
+        if getattr(original, "_profiled", False):
+            return
+        self._patched.append((namespace, attr, original))
+        namespace[attr] = self.wrap(name, original)
+
+    def instrument_videokit(self, encoder=False):
+        """Wrap videokit's drawing helpers, Pillow's primitives and, with
+        `encoder`, FFmpegWriter.write."""
+        for short in DRAWING_MODULES:
+            module = sys.modules.get(f"videokit.{short}")
+            if module is not None:
+                self.instrument(vars(module), prefix=short)
+        for owner, label, attrs in PILLOW:
+            for attr in attrs:
+                self.patch(owner, attr, f"{label}.{attr}")
+        if encoder:
+            self.patch(FFmpegWriter, "write", "FFmpegWriter.write")
+
+    @contextmanager
+    def scene(self, label):
+        start = self._enter(str(label))
+        try:
+            yield
+        finally:
+            self._exit(start)
+
+    def restore(self):
+        for owner, attr, original in reversed(self._patched):
+            if isinstance(owner, dict):
+                owner[attr] = original
+            else:
+                setattr(owner, attr, original)
+        self._patched.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.restore()
+
+    def folded(self, root=None):
+        """Flame-graph lines, self time in whole microseconds."""
+        lines = []
+        for path, seconds in sorted(self.own.items()):
+            us = round(seconds * 1e6)
+            if us > 0:
+                frames = ((root,) if root else ()) + path
+                lines.append(";".join(f.replace(";", ",").replace(" ", "_") for f in frames) + f" {us}")
+        return lines
+
+    def primitives(self, scene=None):
+        """{name: [calls, total s, self s]} summed over paths (or one scene's)."""
+        rows = defaultdict(lambda: [0, 0.0, 0.0])
+        for path, calls in self.calls.items():
+            if len(path) < 2 or (scene is not None and path[0] != scene):
+                continue
+            name = path[-1]
+            row = rows[name]
+            row[0] += calls
+            row[2] += self.own[path]
+            if name not in path[1:-1]:  # recursion would count twice
+                row[1] += self.total[path]
+        return dict(rows)
+
+    def scenes(self):
+        """{scene: (frames, total s)} for the paths rooted at a scene."""
+        return {path[0]: (self.calls[path], self.total[path]) for path in self.calls if len(path) == 1}
+
+
+def format_primitives(rows, top=25):
+    lines = [f"{'primitive':36} {'calls':>8} {'total ms':>10} {'self ms':>10}"]
+    for name, (calls, total, own) in sorted(rows.items(), key=lambda kv: -kv[1][2])[:top]:
+        lines.append(f"{name[:36]:36} {calls:8d} {1000 * total:10.1f} {1000 * own:10.1f}")
+    return "\n".join(lines)
+
+
+def format_scenes(scenes):
+    lines = [f"{'scene':36} {'frames':>8} {'ms/frame':>10}"]
+    for label, (frames, total) in scenes.items():
+        lines.append(f"{label[:36]:36} {frames:8d} {1000 * total / frames:10.1f}")
+    return "\n".join(lines)
+
+
+def _folder_modules(module):
+    """Modules loaded from the script's own folder, other than the script."""
+    folder = Path(module.__file__).resolve().parent
+    return [m for m in list(sys.modules.values())
+            if m is not module and getattr(m, "__file__", None) and Path(m.__file__).resolve().parent == folder]
+
+
+def _rgba_bytes(frame):
+    if not isinstance(frame, Image.Image):
+        frame = Image.fromarray(frame)
+    return frame.convert("RGBA").tobytes(), frame.size
+
+
+def profile_script(name, frames_per_scene=4, encode=False):
+    """Draw (and optionally encode) sampled frames of `name` under a Profiler."""
+    module = load_script(name)
+    frame_fn, runs = frame_source(module)  # builds lazy timelines outside any scene
+    with Profiler() as prof, tempfile.TemporaryDirectory() as tmp:
+        local = _folder_modules(module)
+        names = {m.__name__ for m in local}
+        prof.instrument(vars(module), local=names)
+        for sibling in local:
+            prof.instrument(vars(sibling), prefix=sibling.__name__, local=names)
+        prof.instrument_videokit(encoder=encode)
+        writer = None
+        try:
+            for label, start, stop in runs:
+                for i in _samples(start, stop, frames_per_scene):
+                    with prof.scene(label):
+                        frame = frame_fn(i)
+                    if encode:
+                        with prof.scene("encode"):
+                            buf, size = _rgba_bytes(frame)
+                            if writer is None:
+                                writer = FFmpegWriter(Path(tmp) / "profile.mp4", size, module.FPS)
+                            writer.write(buf)
+        finally:
+            if writer is not None:
+                writer.close()
+    return prof
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m videokit.profile", description=__doc__.splitlines()[0])
+    parser.add_argument("script", help=f"one of: {', '.join(SCRIPTS)}")
+    parser.add_argument("--frames", type=int, default=4, help="profiled frames per scene (default 4)")
+    parser.add_argument("--encode", action="store_true", help="also feed the frames to ffmpeg")
+    parser.add_argument("--by-scene", action="store_true", help="print the primitive table for each scene")
+    parser.add_argument("--top", type=int, default=25, help="rows per primitive table (default 25)")
+    parser.add_argument("-o", "--out", type=Path, help="folded output (default: <script>.folded)")
+    args = parser.parse_args(argv)
+    if args.script not in SCRIPTS:
+        parser.error(f"unknown script {args.script!r}; choose from {', '.join(SCRIPTS)}")
+
+    prof = profile_script(args.script, args.frames, args.encode)
+    print(format_scenes(prof.scenes()))
+    print()
+    print(format_primitives(prof.primitives(), args.top))
+    if args.by_scene:
+        for label in prof.scenes():
+            print(f"\n[{label}]")
+            print(format_primitives(prof.primitives(label), args.top))
+    out = args.out or Path(f"{args.script}.folded")
+    out.write_text("\n".join(prof.folded(root=args.script)) + "\n")
+    print(f"\nfolded stacks written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Parallel frame rendering with an ordered, bounded feed to the encoder.
+
+Frame functions in these scripts are pure functions of the frame index, so
+contiguous chunks of indices are rendered on a forked process pool and
+handed back strictly in order:
+
+    for frame in render_frames(lambda i: make_frame(i / FPS), TOTAL_FRAMES):
+        writer.append_data(frame)
+
+Workers are forked, so the frame function does not need to be picklable and
+each worker inherits fonts, backgrounds and static layers already built by
+the parent. Scripts build those lazily, so the first frame is drawn in the
+parent before the fork to make sure they exist there. At most ``max_in_flight`` chunks are queued or held at once.
+Set VIDEOKIT_WORKERS to override the worker count (1 renders in-process).
+
+render_shared() is the same loop, but workers paste RGBA frames into a
+shared-memory FramePool and the caller gets a memoryview per frame to write
+to the encoder, so frames are never pickled or turned into bytes. The
+pool holds ``max_in_flight * chunk`` frames; when that would not fit the
+shared-memory budget (see videokit.framepool) chunks and then the chunks in
+flight shrink, and if not even one frame fits, frames come through
+render_frames() as bytes instead.
+
+Both accept ``key_fn(i)``: a hashable summary of everything frame i depends
+on, or None if it depends on continuous time. Runs of consecutive frames
+with the same key are rendered once and the buffer is handed out again for
+the rest of the run; pass a RenderStats to see how many frames were skipped.
+"""
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from .framepool import FramePool, frame_slots
+
+_FRAME_FN = None
+_POOL = None
+_LEADERS = None
+
+
+@dataclass
+class RenderStats:
+    frames: int = 0
+    rendered: int = 0
+    cached: int = 0  # frames of segments reused from the cache, neither drawn nor skipped
+    segments: int = 0
+    segments_cached: int = 0
+    # Per pipeline stage: seconds spent working, and lane-seconds available
+    # (wall time x processes or threads running that stage).
+    busy: dict = field(default_factory=dict)
+    capacity: dict = field(default_factory=dict)
+
+    @property
+    def skipped(self):
+        return self.frames - self.rendered - self.cached
+
+    def add_busy(self, stage, seconds):
+        self.busy[stage] = self.busy.get(stage, 0.0) + seconds
+
+    def add_capacity(self, stage, seconds):
+        self.capacity[stage] = self.capacity.get(stage, 0.0) + seconds
+
+    def merge_stages(self, other):
+        for stage, seconds in other.busy.items():
+            self.add_busy(stage, seconds)
+        for stage, seconds in other.capacity.items():
+            self.add_capacity(stage, seconds)
+
+    def utilization(self):
+        return {stage: self.busy.get(stage, 0.0) / cap for stage, cap in self.capacity.items() if cap > 0}
+
+    def __str__(self):
+        text = f"rendered {self.rendered} of {self.frames} frames ({self.skipped} skipped as unchanged)"
+        if self.segments:
+            text += (f"; reused {self.segments_cached} of {self.segments} cached scene segments"
+                     f" ({self.cached} frames)")
+        if self.capacity:
+            text += "; stage utilization: " + ", ".join(
+                f"{stage} {share:.0%}" for stage, share in self.utilization().items())
+        return text
+
+
+def hold_plan(n_frames, key_fn=None):
+    """Return (leaders, repeats): frames to render and how often each is emitted."""
+    if key_fn is None:
+        return list(range(n_frames)), [1] * n_frames
+    leaders, repeats = [], []
+    prev = None
+    for i in range(n_frames):
+        key = key_fn(i)
+        if key is not None and key == prev:
+            repeats[-1] += 1
+        else:
+            leaders.append(i)
+            repeats.append(1)
+        prev = key
+    return leaders, repeats
+
+
+def default_workers():
+    env = os.environ.get("VIDEOKIT_WORKERS")
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def _render_chunk(start, stop):
+    return [_FRAME_FN(_LEADERS[k]) for k in range(start, stop)]
+
+
+def _render_chunk_shared(start, stop):
+    draw = copy = 0.0
+    for k in range(start, stop):
+        t0 = time.perf_counter()
+        frame = _FRAME_FN(_LEADERS[k])
+        t1 = time.perf_counter()
+        _POOL.write(k % _POOL.slots, frame)
+        draw, copy = draw + t1 - t0, copy + time.perf_counter() - t1
+    return start, stop, draw, copy
+
+
+def _ordered(task, n_frames, workers, chunk, max_in_flight):
+    """Run `task(start, stop)` over chunks on a fork pool; yield results in order."""
+    import multiprocessing as mp
+
+    with mp.get_context("fork").Pool(workers) as pool:
+        pending = deque()
+        next_start = 0
+        while next_start < n_frames or pending:
+            while next_start < n_frames and len(pending) < max_in_flight:
+                stop = min(n_frames, next_start + chunk)
+                pending.append(pool.apply_async(task, (next_start, stop)))
+                next_start = stop
+            yield pending.popleft().get()
+
+
+def _parallel(workers):
+    import multiprocessing as mp
+
+    return workers > 1 and "fork" in mp.get_all_start_methods()
+
+
+def _warm(frame_fn, indices):
+    # Fill the lazily built caches once here rather than once per worker.
+    if indices:
+        frame_fn(indices[0])
+
+
+def render_frames(frame_fn, n_frames, workers=None, chunk=8, max_in_flight=None,
+                  key_fn=None, stats=None):
+    """Yield frame_fn(0) ... frame_fn(n_frames - 1) in order."""
+    global _FRAME_FN, _LEADERS
+    workers = default_workers() if workers is None else workers
+    leaders, repeats = hold_plan(n_frames, key_fn)
+    if stats is not None:
+        stats.frames, stats.rendered = n_frames, len(leaders)
+    if not _parallel(workers):
+        for i, n in zip(leaders, repeats):
+            frame = frame_fn(i)
+            for _ in range(n):
+                yield frame
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    _warm(frame_fn, leaders)
+    _FRAME_FN, _LEADERS = frame_fn, leaders
+    try:
+        k = 0
+        for frames in _ordered(_render_chunk, len(leaders), workers, chunk, max_in_flight):
+            for frame in frames:
+                for _ in range(repeats[k]):
+                    yield frame
+                k += 1
+    finally:
+        _FRAME_FN, _LEADERS = None, None
+
+
+def render_shared(frame_fn, n_frames, size, workers=None, chunk=4, max_in_flight=None,
+                  key_fn=None, stats=None):
+    """Yield a memoryview of each RGBA frame in order, via shared-memory slots.
+
+    `frame_fn(i)` must return an RGBA image of `size`. A view is only valid
+    until the next iteration; write it to the encoder straight away.
+    """
+    global _FRAME_FN, _POOL, _LEADERS
+    workers = default_workers() if workers is None else workers
+    slots = frame_slots(size)
+    if slots < 1:
+        for frame in render_frames(frame_fn, n_frames, workers, chunk, max_in_flight, key_fn, stats):
+            yield memoryview(frame.convert("RGBA").tobytes())
+        return
+    leaders, repeats = hold_plan(n_frames, key_fn)
+    if stats is not None:
+        stats.frames, stats.rendered = n_frames, len(leaders)
+    if not _parallel(workers):
+        with FramePool(size, 1) as pool:
+            for i, n in zip(leaders, repeats):
+                pool.write(0, frame_fn(i))
+                with pool.view(0) as view:
+                    for _ in range(n):
+                        yield view
+        return
+
+    # A chunk's slots are reused only after every older chunk has been consumed.
+    max_in_flight = max_in_flight or 2 * workers
+    if max_in_flight * chunk > slots:
+        chunk = max(1, min(chunk, slots // max_in_flight))
+        max_in_flight = min(max_in_flight, slots // chunk)
+    _warm(frame_fn, leaders)
+    with FramePool(size, max_in_flight * chunk) as pool:
+        _FRAME_FN, _POOL, _LEADERS = frame_fn, pool, leaders
+        try:
+            for start, stop, draw, copy in _ordered(_render_chunk_shared, len(leaders), workers,
+                                                    chunk, max_in_flight):
+                if stats is not None:
+                    stats.add_busy("draw", draw)
+                    stats.add_busy("copy", copy)
+                for k in range(start, stop):
+                    with pool.view(k % pool.slots) as view:
+                        for _ in range(repeats[k]):
+                            yield view
+        finally:
+            _FRAME_FN, _POOL, _LEADERS = None, None, None
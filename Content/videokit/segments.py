@@ -0,0 +1,245 @@
+"""Per-scene encoded segments, cached on disk by a hash of their inputs.
+
+Each scene is encoded to its own MP4 under a cache directory and the final
+video is a stream-copy concat of those files, so a re-run only renders the
+scenes whose inputs changed:
+
+    cache = SegmentCache(HERE / ".videokit-cache",
+                         code_fingerprint(__file__, globals(), exclude=("scenes", "after_state")))
+    segments = [(s["name"], start, stop, (s,)) for s, start, stop in TIMELINE.runs()]
+    render_segments(out_path, frame_fn, segments, (W, H), FPS, cache, state_fn=frame_state)
+
+A segment's key combines the script fingerprint (its source and any extra
+`sources` minus `exclude`, the source of the videokit modules that decide
+its pixels or encoding, the fonts it loaded and the versions of Pillow and
+any other `packages` it draws with), the encoder settings, the segment's
+frame range and inputs, and ``state_fn(i)`` for each of its frames. Functions named in
+`exclude` must therefore have their effect on a frame captured by the
+segment inputs or by state_fn, e.g. pass a scene's draw function as an
+input or return ``after_state(...)`` from state_fn.
+
+Segments that need encoding are rendered and encoded in parallel, one
+scene per forked worker, each with its own ffmpeg; a lone segment falls
+back to frame-level workers instead. The workers split the shared-memory
+budget (see videokit.framepool), so fewer run when it is small. Every segment is a separate encode,
+so it starts on a keyframe and the concat never cuts a GOP. Set
+VIDEOKIT_RERENDER to a comma-separated list of scene labels (or "all") to
+re-encode those scenes regardless of the cache. With VIDEOKIT_PREVIEW set,
+render_segments() writes a preview instead (see videokit.preview).
+
+With VIDEOKIT_ASPECTS set, each segment is also cut to the requested feed
+formats in the same encode (see videokit.aspects), each cut cached on its
+own, and every format is concatenated to its own file. With VIDEOKIT_STILLS
+set, the chosen frames are saved as images on their way to the encoder
+(see videokit.stills).
+"""
+import ast
+import hashlib
+import inspect
+import os
+import textwrap
+from pathlib import Path
+
+import PIL
+from PIL import ImageFont
+
+from .aspects import MASTER, AspectWriter, aspect_path, aspects_from_env, layouts
+from .encode import FFmpegWriter, concat
+from .framepool import frame_slots
+from .pipeline import encode_frames
+from .preview import Preview, render_preview
+from .runner import RenderStats, _parallel, _warm, default_workers
+from .stills import StillCapture
+
+_VIDEOKIT_DIR = Path(__file__).resolve().parent
+# The videokit modules a segment's output depends on: those deciding a frame's pixels, plus
+# encode (codec, pixel format, x264 args) and aspects (the cuts' filter graph), since concat
+# needs every part encoded alike. Caching, scheduling and tooling (segments, runner, pipeline,
+# bench, ...) are left out so changing them keeps the cache.
+OUTPUT_MODULES = ("arrows", "aspects", "backgrounds", "compositor", "encode", "fonts", "hires", "plan",
+                  "slides", "sprites", "textlayout", "timeline")
+_JOB = None
+
+
+def _node_name(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return node.name
+    if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+        return node.targets[0].id
+    return None
+
+
+def _is_docstring(node):
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str))
+
+
+def _source_digest(src, exclude=()):
+    # ast.dump ignores comments, blank lines and line numbers; module docstrings are dropped too.
+    tree = ast.parse(src)
+    tree.body = [n for n in tree.body if not _is_docstring(n) and _node_name(n) not in exclude]
+    return ast.dump(tree)
+
+
+def _font_digest(font):
+    path = getattr(font, "path", None)
+    if isinstance(path, (str, os.PathLike)) and os.path.exists(path):
+        st = os.stat(path)
+        return f"{path}:{font.size}:{getattr(font, 'index', 0)}:{st.st_size}:{st.st_mtime_ns}"
+    return f"{type(font).__name__}:{getattr(font, 'size', None)}"
+
+
+def _package_version(name):
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def code_fingerprint(path, namespace=None, exclude=(), sources=(), packages=()):
+    """Hash everything a script's frames depend on apart from per-scene inputs.
+
+    `sources` are further files the script draws with (a scene engine next
+    to it, say), hashed like the script itself, `exclude` included.
+    `packages` names installed distributions that rasterize for it (moviepy,
+    say), whose versions are hashed like Pillow's.
+    """
+    h = hashlib.sha256()
+    for src in (path, *sources):
+        h.update(_source_digest(Path(src).read_text(encoding="utf-8"), exclude).encode())
+    for name in OUTPUT_MODULES:
+        h.update((_VIDEOKIT_DIR / f"{name}.py").read_bytes())
+    fonts = []
+    for name, value in sorted((namespace or {}).items()):
+        if isinstance(value, ImageFont.FreeTypeFont):
+            fonts.append(f"{name}={_font_digest(value)}")
+    h.update("\n".join(fonts).encode())
+    h.update(PIL.__version__.encode())
+    for name in packages:
+        h.update(f"{name}={_package_version(name)}".encode())
+    return h.hexdigest()
+
+
+def _input_digest(value):
+    if callable(value) and hasattr(value, "__code__"):
+        return _source_digest(textwrap.dedent(inspect.getsource(value)))
+    return repr(value)
+
+
+class SegmentCache:
+    """A directory of encoded scene segments named by their input hash."""
+
+    def __init__(self, directory, fingerprint):
+        self.directory = Path(os.environ.get("VIDEOKIT_CACHE", directory))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = fingerprint
+
+    def key(self, start, stop, inputs=(), state_fn=None, encoder=()):
+        h = hashlib.sha256(self.fingerprint.encode())
+        h.update(repr(encoder).encode())
+        h.update(f"{start}:{stop}".encode())
+        for value in inputs:
+            h.update(_input_digest(value).encode())
+        if state_fn is not None:
+            for i in range(start, stop):
+                h.update(repr(state_fn(i)).encode())
+        return h.hexdigest()[:32]
+
+    def path(self, key):
+        return self.directory / f"{key}.mp4"
+
+    def aspect_key(self, key, name, placed):
+        """Key of cut `name` (placed as aspects.layouts() says) of the segment cached under `key`."""
+        return hashlib.sha256(f"{key}:{name}:{placed!r}".encode()).hexdigest()[:32]
+
+
+def rerender_labels():
+    env = os.environ.get("VIDEOKIT_RERENDER", "")
+    return {label.strip() for label in env.split(",") if label.strip()}
+
+
+def _encode_segment(parts, start, stop, workers):
+    # parts: {aspect name: cache path} still missing for this segment.
+    frame_fn, key_fn, size, fps, crf, regions, stills, share = _JOB
+    seg = RenderStats()
+    seg_key_fn = None if key_fn is None else (lambda k: key_fn(start + k))
+    tmps = {name: part.with_name(part.stem + ".part.mp4") for name, part in parts.items()}
+    if list(tmps) == [MASTER]:
+        writer = FFmpegWriter(tmps[MASTER], size, fps, crf=crf)
+    else:
+        writer = AspectWriter(tmps, size, fps, regions, crf=crf, span=(start, stop))
+    with writer:
+        encode_frames(stills.tee(writer, start), lambda k: frame_fn(start + k), stop - start, size,
+                      workers=workers, key_fn=seg_key_fn, stats=seg,
+                      depth=max(1, min(4, frame_slots(size, share) - 2)))
+    stills.wait()
+    for name, part in parts.items():
+        os.replace(tmps[name], part)
+    return seg
+
+
+def _encode_segment_task(args):
+    return _encode_segment(*args, workers=1)
+
+
+def render_segments(out_path, frame_fn, segments, size, fps, cache, state_fn=None, key_fn=None,
+                    crf=None, workers=None, stats=None, regions=None, hires_fn=None):
+    """Encode each (label, start, stop, inputs) segment unless cached, then concat them.
+
+    `frame_fn(i)` and `key_fn(i)` take absolute frame indices, as for
+    render_shared(). `regions` lays out the VIDEOKIT_ASPECTS cuts (see
+    videokit.aspects) and `hires_fn(i, scale)` redraws frame i larger for
+    VIDEOKIT_STILLS. Returns the path written.
+    """
+    global _JOB
+    runs = [(label, start, stop) for label, start, stop, _ in segments]
+    n_frames = max(stop for _, _, stop in runs)
+    preview = Preview.from_env()
+    if preview is not None:
+        return render_preview(out_path, frame_fn, n_frames, size, fps, preview, runs,
+                              key_fn=key_fn, stats=stats)
+    workers = default_workers() if workers is None else workers
+    force = rerender_labels()
+    names = aspects_from_env()
+    parts, todo = [], []
+    for label, start, stop, inputs in segments:
+        key = cache.key(start, stop, inputs, state_fn, encoder=(size, fps, crf))
+        seg_parts = {MASTER: cache.path(key)}
+        for name in names:
+            placed = layouts(size, name, regions, (start, stop))
+            seg_parts[name] = cache.path(cache.aspect_key(key, name, placed))
+        forced = label in force or "all" in force
+        missing = {name: part for name, part in seg_parts.items() if forced or not part.exists()}
+        if missing:
+            todo.append((missing, start, stop))
+        parts.append(seg_parts)
+
+    encoded = []
+    with StillCapture(out_path, size, n_frames, frame_fn, runs, hires_fn) as stills:
+        # Each segment worker's encoder queue takes at least three frame slots.
+        procs = min(workers, len(todo), max(1, frame_slots(size) // 3))
+        parallel = len(todo) > 1 and _parallel(procs)
+        _JOB = (frame_fn, key_fn, size, fps, crf, regions, stills, procs if parallel else 1)
+        try:
+            if parallel:
+                import multiprocessing as mp
+
+                _warm(frame_fn, [start for _, start, _ in todo])
+                with mp.get_context("fork").Pool(procs) as pool:
+                    encoded = list(pool.imap_unordered(_encode_segment_task, todo))
+            else:
+                encoded = [_encode_segment(missing, start, stop, workers) for missing, start, stop in todo]
+        finally:
+            _JOB = None
+        for name in [MASTER, *names]:
+            concat([seg_parts[name] for seg_parts in parts], aspect_path(out_path, name))
+    if stats is not None:
+        stats.frames = sum(stop - start for _, start, stop, _ in segments)
+        stats.rendered = sum(seg.rendered for seg in encoded)
+        stats.cached = stats.frames - sum(stop - start for _, start, stop in todo)
+        for seg in encoded:
+            stats.merge_stages(seg)
+        stats.segments, stats.segments_cached = len(segments), len(segments) - len(todo)
+    return out_path
@@ -0,0 +1,64 @@
+"""Text sprites: rasterize a constant label once, then blit it every frame.
+
+    blit_text(draw, (40, 40), "Kafka Topic", fill=TEXT, font=FONT_SUB)
+
+is a drop-in for ``draw.text(...)``. The first call for a given (text,
+font, sub-pixel offset) renders the glyph coverage into an "L" mask; later
+calls hand that mask to ``draw.bitmap()`` with the fill colour. That is
+the same draw_bitmap() call ImageDraw.text() makes with its FreeType mask,
+so the output is byte-identical, and one sprite serves every colour.
+
+Only use it for strings that repeat across frames (titles, box labels,
+credits); counters that change every frame would just churn the LRU.
+Multiline text, anchors and strokes fall back to draw.text(), as does a
+draw without bitmap() (a videokit.hires.ScaledDraw, which scales text).
+"""
+import math
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+_PAD = 3
+_EMPTY = (None, 0, 0)
+
+
+def _lands_on(o, f):
+    # ImageDraw.text() rasterizes at int(x) with sub-pixel start modf(x); the sprite must match.
+    return int(o + f) == o and math.modf(o + f)[0] == f
+
+
+@lru_cache(maxsize=2048)
+def _sprite(text, font, fx, fy):
+    """(mask, dx, dy) relative to the integer text origin, or None if not representable."""
+    x0, y0, x1, y1 = font.getbbox(text)
+    ox = _PAD - min(0, math.floor(x0))
+    oy = _PAD - min(0, math.floor(y0))
+    if not (_lands_on(ox, fx) and _lands_on(oy, fy)):
+        return None
+    mask = Image.new("L", (ox + math.ceil(x1) + _PAD, oy + math.ceil(y1) + _PAD))
+    ImageDraw.Draw(mask).text((ox + fx, oy + fy), text, fill=255, font=font)
+    box = mask.getbbox()
+    if box is None:
+        return _EMPTY
+    return mask.crop(box), box[0] - ox, box[1] - oy
+
+
+def blit_text(draw, xy, text, fill=None, font=None, **kwargs):
+    x, y = xy
+    fx, fy = math.modf(x)[0], math.modf(y)[0]
+    sprite = None
+    if (not kwargs and font is not None and hasattr(draw, "bitmap")
+            and fx >= 0 and fy >= 0 and "\n" not in text and "\r" not in text):
+        sprite = _sprite(text, font, fx, fy)
+    if sprite is None:
+        return draw.text(xy, text, fill=fill, font=font, **kwargs)
+    mask, dx, dy = sprite
+    if mask is not None:
+        draw.bitmap((int(x) + dx, int(y) + dy), mask, fill=fill)
+
+
+def sprite_report():
+    info = _sprite.cache_info()
+    total = info.hits + info.misses
+    rate = 100.0 * info.hits / total if total else 0.0
+    return f"text sprites: {info.hits} hits / {info.misses} misses ({rate:.1f}%), {info.currsize} cached"
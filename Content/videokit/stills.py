@@ -0,0 +1,177 @@
+"""Stills (posters, thumbnails) saved from the frames of the main render.
+
+Set VIDEOKIT_STILLS to write stills next to the video while it renders:
+
+    VIDEOKIT_STILLS=1                              the middle frame of every scene, as PNG
+    VIDEOKIT_STILLS="frames=0;412,format=webp"     frames 0 and 412, as WebP
+    VIDEOKIT_STILLS="scale=2"                      plus a 2x re-render of each
+
+Keys are frames (frame numbers separated by ";", default each scene's
+midpoint), format (png or webp) and scale (also redraw each still at this
+multiple of the size; only scripts with a high-resolution frame function,
+such as the Scaling videos, can). A still is named after the video and
+its frame, e.g. ``name.still-0412.png`` and ``name.still-0412@2x.png``.
+
+Stills are taken from frames already drawn for the encoder: the writer is
+wrapped so the selected frames are copied as they go to ffmpeg, and
+compressing them runs in a small thread pool (zlib and libwebp release
+the GIL) while drawing carries on. Only frames that were not drawn, those
+of cached segments, and the high-resolution ones are drawn again at the
+end. Previews write no stills; a bad setting exits with a message, as for
+VIDEOKIT_PREVIEW.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+_SAVE_ARGS = {"png": {"compress_level": 6}, "webp": {"quality": 92, "method": 4}}
+
+
+@dataclass(frozen=True)
+class Stills:
+    frames: tuple = None  # None: each scene's middle frame
+    format: str = "png"
+    scale: int = 1
+
+    @classmethod
+    def from_env(cls):
+        """The stills requested by VIDEOKIT_STILLS, or None."""
+        spec = os.environ.get("VIDEOKIT_STILLS", "").strip()
+        if spec.lower() in ("", "0", "off", "false", "no"):
+            return None
+        if spec.lower() in ("1", "on", "true", "yes"):
+            return cls()
+        opts = {}
+        for item in spec.split(","):
+            key, sep, value = item.partition("=")
+            key, value = key.strip(), value.strip()
+            if not sep or key not in ("frames", "format", "scale"):
+                raise SystemExit(f"VIDEOKIT_STILLS: cannot parse {item.strip()!r}")
+            try:
+                if key == "frames":
+                    opts[key] = tuple(int(n) for n in value.split(";") if n.strip())
+                elif key == "scale":
+                    opts[key] = int(value)
+                else:
+                    opts[key] = value.lower()
+            except ValueError:
+                raise SystemExit(f"VIDEOKIT_STILLS: bad {key} {value!r}")
+        if opts.get("format", "png") not in _SAVE_ARGS:
+            raise SystemExit(f"VIDEOKIT_STILLS: format must be one of {', '.join(_SAVE_ARGS)}")
+        return cls(**opts)
+
+    def select(self, n_frames, runs=()):
+        """Frame numbers to save, given (label, start, stop) scene runs."""
+        if self.frames is None:
+            frames = [(start + stop - 1) // 2 for _, start, stop in runs] or [n_frames // 2]
+        else:
+            frames = self.frames
+        bad = [i for i in frames if not 0 <= i < n_frames]
+        if bad:
+            raise SystemExit(f"VIDEOKIT_STILLS: frame {bad[0]} is outside 0..{n_frames - 1}")
+        return sorted(set(frames))
+
+    def path(self, out_path, i, scale=1):
+        out_path = Path(out_path)
+        suffix = f"@{scale}x" if scale != 1 else ""
+        return out_path.with_name(f"{out_path.stem}.still-{i:04d}{suffix}.{self.format}")
+
+
+class _Tee:
+    """A writer passing frames on to `writer`, keeping the ones `capture` wants."""
+
+    def __init__(self, writer, capture, start):
+        self._writer = writer
+        self._capture = capture
+        self._i = start
+
+    def write(self, buf):
+        if self._i in self._capture.wanted:
+            self._capture.save(self._i, Image.frombuffer("RGBA", self._capture.size, bytes(buf)))
+        self._writer.write(buf)
+        self._i += 1
+
+
+class StillCapture:
+    """Saves the selected frames of one render; see the module docstring.
+
+    Use as a context manager around the encode, wrapping its writer with
+    tee(); leaving the block draws whatever was not seen and waits for the
+    files. Without VIDEOKIT_STILLS, tee() returns the writer unchanged.
+    """
+
+    def __init__(self, out_path, size, n_frames, frame_fn, runs=(), hires_fn=None, stills=None, threads=2):
+        self.stills = Stills.from_env() if stills is None else stills
+        self.out_path = out_path
+        self.size = tuple(size)
+        self.frame_fn = frame_fn
+        self.hires_fn = hires_fn
+        self.threads = threads
+        self.wanted = frozenset()
+        self._pool, self._pid, self._pending = None, None, []
+        if self.stills is None:
+            return
+        if self.stills.scale != 1 and hires_fn is None:
+            raise SystemExit(f"VIDEOKIT_STILLS: this script cannot redraw at scale={self.stills.scale}")
+        self.wanted = frozenset(self.stills.select(n_frames, runs))
+        for i in self.wanted:
+            # A still is done once its file exists, also when a forked segment worker wrote it.
+            self.stills.path(out_path, i).unlink(missing_ok=True)
+
+    def tee(self, writer, start=0):
+        """`writer`, or a writer also saving the wanted frames; frame `start` is written first."""
+        return _Tee(writer, self, start) if self.wanted else writer
+
+    def save(self, i, img, scale=1):
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._pid != os.getpid():  # threads do not survive a fork; a worker starts its own
+            self._pool, self._pid, self._pending = ThreadPoolExecutor(self.threads), os.getpid(), []
+        path = self.stills.path(self.out_path, i, scale)
+        self._pending.append(self._pool.submit(_write, img, path, self.stills.format))
+
+    def wait(self):
+        """Block until every still handed to save() by this process is written."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def finish(self):
+        """Draw the stills no encode produced, and the high-resolution ones; returns the paths."""
+        if not self.wanted:
+            return []
+        paths = []
+        for i in sorted(self.wanted):
+            path = self.stills.path(self.out_path, i)
+            if not path.exists():
+                self.save(i, _image(self.frame_fn(i)))
+            paths.append(path)
+            if self.stills.scale != 1:
+                self.save(i, _image(self.hires_fn(i, self.stills.scale)), self.stills.scale)
+                paths.append(self.stills.path(self.out_path, i, self.stills.scale))
+        self.wait()
+        if self._pool is not None:
+            self._pool.shutdown()
+        return paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            for path in self.finish():
+                print("Still:", path)
+        elif self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+def _image(frame):
+    # A copy: frame functions may hand back a canvas they draw the next frame into.
+    return frame.copy() if isinstance(frame, Image.Image) else Image.fromarray(frame)
+
+
+def _write(img, path, fmt):
+    # The frames are opaque; dropping alpha keeps the file from storing a plane of 255s.
+    img.convert("RGB").save(path, format=fmt.upper(), **_SAVE_ARGS[fmt])
@@ -0,0 +1,58 @@
+"""Cached text measurement and word wrapping.
+
+Every textbbox() is a full FreeType layout pass, and the scripts measure
+the same labels and wrap the same card bodies on every frame. Extents are
+memoised per (text, font) and line breaks per (text, font, max_width) in
+bounded LRU caches. Fonts are keyed by identity, which is fine for the
+module-level fonts the scripts load once.
+
+layout_report() prints the hit/miss counters of this process; run with
+VIDEOKIT_WORKERS=1 to see them for a whole render.
+"""
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+# textbbox() on an RGBA draw measures exactly as the scripts' frame draws do.
+_MEASURE = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+
+@lru_cache(maxsize=4096)
+def text_bbox(text, font):
+    return _MEASURE.textbbox((0, 0), text, font=font)
+
+
+def text_size(text, font):
+    x0, y0, x1, y1 = text_bbox(text, font)
+    return x1 - x0, y1 - y0
+
+
+@lru_cache(maxsize=1024)
+def wrap(text, font, max_width):
+    """Greedy word wrap to `max_width`; returns (lines, sizes) as tuples."""
+    words = text.split()
+    if not words:
+        return ("",), (text_size("", font),)
+    lines, cur = [], words[0]
+    for w in words[1:]:
+        trial = cur + " " + w
+        if text_size(trial, font)[0] <= max_width:
+            cur = trial
+        else:
+            lines.append(cur)
+            cur = w
+    lines.append(cur)
+    return tuple(lines), tuple(text_size(ln, font) for ln in lines)
+
+
+def cache_stats():
+    return {"measure": text_bbox.cache_info(), "wrap": wrap.cache_info()}
+
+
+def layout_report():
+    parts = []
+    for name, info in cache_stats().items():
+        total = info.hits + info.misses
+        rate = 100.0 * info.hits / total if total else 0.0
+        parts.append(f"{name} {info.hits} hits / {info.misses} misses ({rate:.1f}%)")
+    return "text layout cache: " + ", ".join(parts)
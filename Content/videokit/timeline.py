@@ -0,0 +1,60 @@
+"""Back-to-back scenes on a time axis, with O(log n) and per-frame lookup.
+
+    TIMELINE = Timeline([(s, s["dur"]) for s in scenes], FPS)
+    scene, local_t, progress = TIMELINE.at(time_s)   # bisect on scene starts
+    scene, local_t, progress = TIMELINE.frame(i)     # precomputed frame table
+
+Scene boundaries are accumulated in order the same way the scripts' own
+``acc += dur`` loops did, so lookups match them exactly. Times before the
+first scene clamp to it and times past the end stay in the last scene.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+
+class Timeline:
+    """Scenes given as (scene, duration) pairs, played back to back."""
+
+    def __init__(self, entries, fps):
+        self.scenes = [scene for scene, _ in entries]
+        self.durations = [float(dur) for _, dur in entries]
+        self.fps = fps
+        self.starts = []
+        acc = 0.0
+        for dur in self.durations:
+            self.starts.append(acc)
+            acc += dur
+        self.duration = acc
+        self.n_frames = int(acc * fps)
+        # Scene index of every frame; the same comparison as bisect_right on the starts.
+        times = np.arange(self.n_frames) / fps
+        self.frame_index = np.clip(np.searchsorted(self.starts, times, side="right") - 1,
+                                   0, len(self.scenes) - 1)
+
+    def index_at(self, t):
+        return min(max(bisect_right(self.starts, t) - 1, 0), len(self.scenes) - 1)
+
+    def _lookup(self, k, t):
+        local_t = t - self.starts[k]
+        dur = self.durations[k]
+        return self.scenes[k], local_t, (local_t / dur if dur > 0 else 1.0)
+
+    def at(self, t):
+        """(scene, local_t, progress) for time `t` in seconds."""
+        return self._lookup(self.index_at(t), t)
+
+    def frame(self, i):
+        """(scene, local_t, progress) for frame `i`."""
+        if 0 <= i < self.n_frames:
+            return self._lookup(int(self.frame_index[i]), i / self.fps)
+        return self.at(i / self.fps)
+
+    def start(self, scene):
+        return self.starts[self.scenes.index(scene)]
+
+    def runs(self):
+        """(scene, start_frame, stop_frame) for every scene that owns at least one frame."""
+        bounds = np.flatnonzero(np.diff(self.frame_index)) + 1
+        edges = [0, *bounds.tolist(), self.n_frames]
+        return [(self.scenes[int(self.frame_index[a])], a, b) for a, b in zip(edges, edges[1:]) if b > a]